@@ -1,14 +1,39 @@
 import os
+import re
+import json
+import argparse
 import numpy as np
 import pandas as pd
 import soundfile as sf
-import librosa
 import multiprocessing as mp
+from collections import OrderedDict
+from multiprocessing.util import Finalize
 from functools import lru_cache
-from typing import Dict, List, Tuple
-from binamix.sadie_utilities import TrackObject, mix_tracks_binaural
+from typing import Dict, List, Optional, Tuple
+from binamix.sadie_utilities import (
+    TrackObject,
+    convolve_binaural_batch,
+    gather_sadie_irs,
+    mix_tracks_binaural,
+    resolve_sadie_ir_rows,
+)
+from binamix.opus_transcode_utilities import BITRATES, opus_round_trip, resolve_opus_backend
 import myRand
-from randManipulateAudio import getRandomTimeWindow, randomlyShiftAudioStartTime
+from corpus import ClipCorpus, decode_clip, open_corpus
+from dataset_io import (
+    BackgroundWriter,
+    list_shards,
+    make_metadata_writer,
+    make_writer,
+    read_metadata,
+    remove_metadata,
+    replace_metadata,
+)
+from randManipulateAudio import (
+    getRandomTimeWindow,
+    getRandomTimeWindowFromFile,
+    randomlyShiftAudioStartTime,
+)
 from utils import azel_to_cartesian
 
 # ---------------------------
@@ -18,6 +43,8 @@ SR = 44100
 WINDOW_TIME = 0.1
 TARGET_LEN_SAMPLES = int(WINDOW_TIME * SR)
 MAX_CLIPS_PER_SAMPLE = 4
+SUBJECT_ID = "D1"
+IR_TYPE = "HRIR"
 
 # Classes (fixed & cleaned)
 CLASS_CSV_MAP = {
@@ -45,6 +72,113 @@ CLASS_WEIGHTS = {
     "weapons": 2,  # 1.5x more likely than doors
 }
 
+# Byte budget of the per-worker cache of decoded clips (mono float32 at SR)
+CLIP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Pre-decoded corpus built by `python corpus.py`. When present, clips are sliced
+# from its shared memmap instead of being decoded per sample.
+CORPUS_DIR = "csv_output/corpus"
+USE_CORPUS = True
+
+# Output backend: "wav" (one file per sample) or "npy" (per-worker shards of
+# SHARD_SIZE samples with JSON sidecars, see dataset_io.py)
+OUTPUT_FORMAT = "wav"
+SHARD_SIZE = 4096
+
+# Encoding and disk writes run on a writer thread (one per process) so rendering
+# never waits on I/O. WRITE_QUEUE_SIZE bounds the pending writes per process.
+BACKGROUND_WRITES = True
+WRITE_QUEUE_SIZE = 64
+
+# Metadata: "parquet" (dataset_metadata.parquet/, typed list columns, needs
+# pyarrow) or "csv" (dataset_metadata.csv, list columns comma-joined)
+METADATA_FORMAT = "parquet"
+
+# Files longer than this are never decoded whole: the window offset is drawn from
+# the frame count and only the window (plus a resampler margin) is read.
+PARTIAL_READ_MIN_SECONDS = 10.0
+
+# Root seed of a dataset. Sample i draws everything from its own generator
+# seeded with (SEED, i), so any id regenerates identically on its own, in any
+# process and with any worker count or batch size.
+SEED = 2003
+
+# Codec augmentation: with probability CODEC_PROBABILITY a sample is Opus encoded and
+# decoded in memory at a bitrate (kbps) drawn from CODEC_BITRATES before it is written.
+# The bitrate goes to the codec_bitrate metadata column (0 = left clean). The draws come
+# from the sample's own CODEC_RNG_STREAM generator, so the scenes don't change with it.
+# CODEC_BACKEND is a binamix.opus_transcode_utilities backend. 0.0 turns the stage off.
+CODEC_PROBABILITY = 0.0
+CODEC_BITRATES = BITRATES
+CODEC_BACKEND = "auto"
+CODEC_RNG_STREAM = 1
+
+
+# ---------------------------
+# Decoded clip cache
+# ---------------------------
+class ClipCache:
+    """LRU cache of decoded clips bounded by a total byte budget.
+
+    Every process keeps its own instance (module global), so pool workers never
+    share or lock it. Cached arrays are marked read-only; callers slice them.
+    """
+
+    def __init__(self, max_bytes: int = CLIP_CACHE_MAX_BYTES, sr: int = SR):
+        self.max_bytes = max_bytes
+        self.sr = sr
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._clips: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def get(self, audio_path: str) -> np.ndarray:
+        clip = self._clips.get(audio_path)
+        if clip is not None:
+            self._clips.move_to_end(audio_path)
+            self.hits += 1
+            return clip
+
+        self.misses += 1
+        clip = decode_clip(audio_path, self.sr)
+        clip.flags.writeable = False
+        if clip.nbytes <= self.max_bytes:
+            self._clips[audio_path] = clip
+            self.nbytes += clip.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._clips.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return clip
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "clips": len(self._clips),
+            "bytes": self.nbytes,
+        }
+
+
+_clip_cache = ClipCache()
+
+
+def clip_cache_stats() -> Dict:
+    return _clip_cache.stats()
+
+
+@lru_cache(maxsize=1)
+def get_corpus() -> Optional[ClipCorpus]:
+    """The compiled corpus, or None when it is disabled or has not been built."""
+    if not USE_CORPUS:
+        return None
+    corpus = open_corpus(CORPUS_DIR)
+    if corpus is not None and corpus.sr != SR:
+        print(f"Warning: corpus at {CORPUS_DIR} is {corpus.sr} Hz, expected {SR}. Ignoring it.")
+        return None
+    return corpus
+
 
 # ---------------------------
 # CSV / metadata caching
@@ -56,24 +190,78 @@ def load_csv(csv_path: str) -> pd.DataFrame:
     return pd.read_csv(csv_path)
 
 
-def get_random_clip_from_class(class_key: str) -> Tuple[np.ndarray, int, str]:
+@lru_cache(maxsize=None)
+def audio_frames(audio_path: str) -> Tuple[int, int]:
+    """(frames, samplerate) of an audio file, read from its header once per worker."""
+    info = sf.info(audio_path)
+    return info.frames, info.samplerate
+
+
+def read_random_window(
+    audio_path: str,
+    window_time: float,
+    sr: int = SR,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
     """
-    Returns (audio, sr, class_name)
+    Random ``window_time`` window of a file as mono float32 at ``sr``.
+    Long files are read partially, short ones go through the decode cache.
+    """
+    frames, file_sr = audio_frames(audio_path)
+    if frames > PARTIAL_READ_MIN_SECONDS * file_sr:
+        return getRandomTimeWindowFromFile(
+            audio_path, window_time, sr, frames=frames, file_sr=file_sr, rng=rng
+        )
+    if sr == _clip_cache.sr:
+        audio = _clip_cache.get(audio_path)
+    else:
+        audio = decode_clip(audio_path, sr)
+    return getRandomTimeWindow(audio, window_time, sr, rng=rng)
+
+
+def pick_clip_path(
+    class_key: str, rng: Optional[np.random.Generator] = None
+) -> Tuple[str, str]:
+    """
+    Returns (audio_path, class_name) of a random clip listed in the class CSV
     """
     directory, csv_path = CLASS_CSV_MAP[class_key]
     df = load_csv(csv_path)
-    row = df.sample(1).iloc[0]
-    audio_path = os.path.join(directory, row["name"])
-    # Fast load
-    audio, sr = sf.read(audio_path, always_2d=False)
-    if audio.ndim > 1:
-        # Mix to mono if stereo
-        audio = np.mean(audio, axis=1)
-    if sr != SR:
-        # Faster resample option via librosa with kaiser_fast
-        audio = librosa.resample(audio, orig_sr=sr, target_sr=SR)
-        sr = SR
-    return audio, sr, row["class"]
+    row = df.sample(1, random_state=rng).iloc[0]
+    return os.path.join(directory, row["name"]), row["class"]
+
+
+def get_random_clip_from_class(
+    class_key: str, rng: Optional[np.random.Generator] = None
+) -> Tuple[np.ndarray, int, str]:
+    """
+    Returns (audio, sr, class_name)
+    """
+    corpus = get_corpus()
+    if corpus is not None and corpus.has_group(class_key):
+        audio, class_name = corpus.pick(class_key, rng)
+        return audio, SR, class_name
+
+    audio_path, class_name = pick_clip_path(class_key, rng)
+    audio = _clip_cache.get(audio_path)
+    return audio, SR, class_name
+
+
+def get_random_window_from_class(
+    class_key: str,
+    window_time: float = WINDOW_TIME,
+    rng: Optional[np.random.Generator] = None,
+) -> Tuple[np.ndarray, str]:
+    """
+    Returns (window_audio, class_name) for a random clip of the class at SR
+    """
+    corpus = get_corpus()
+    if corpus is not None and corpus.has_group(class_key):
+        audio, class_name = corpus.pick(class_key, rng)
+        return getRandomTimeWindow(audio, window_time, SR, rng=rng), class_name
+
+    audio_path, class_name = pick_clip_path(class_key, rng)
+    return read_random_window(audio_path, window_time, SR, rng), class_name
 
 
 # ---------------------------
@@ -106,22 +294,20 @@ def list_ambient_files() -> List[str]:
 
 
 def get_random_ambient_window(
-    window_time: float = WINDOW_TIME, sr: int = SR
+    window_time: float = WINDOW_TIME,
+    sr: int = SR,
+    rng: Optional[np.random.Generator] = None,
 ) -> np.ndarray:
-    files = list_ambient_files()
-    if not files:
-        return np.zeros(int(window_time * sr), dtype=np.float32)
-    path = np.random.choice(files)
-    audio, file_sr = sf.read(path, always_2d=False)
-    if audio.ndim > 1:
-        audio = np.mean(audio, axis=1)
-    if file_sr != sr:
-        audio = librosa.resample(
-            audio,
-            orig_sr=file_sr,
-            target_sr=sr,
-        )
-    window = getRandomTimeWindow(audio, window_time, sr)
+    corpus = get_corpus()
+    if corpus is not None and corpus.has_group("ambient") and sr == corpus.sr:
+        audio, _ = corpus.pick("ambient", rng)
+        window = getRandomTimeWindow(audio, window_time, sr, rng=rng)
+    else:
+        files = list_ambient_files()
+        if not files:
+            return np.zeros(int(window_time * sr), dtype=np.float32)
+        path = myRand.pick_random_clip(files, rng)
+        window = read_random_window(path, window_time, sr, rng)
     if len(window) < int(window_time * sr):
         window = np.pad(window, (0, int(window_time * sr) - len(window)))
     return window.astype(np.float32)
@@ -138,11 +324,20 @@ def ensure_length_exact(audio: np.ndarray, target: int) -> np.ndarray:
     return audio
 
 
-def apply_random_start_shift(window_audio: np.ndarray, is_first: bool) -> np.ndarray:
+def apply_random_start_shift(
+    window_audio: np.ndarray,
+    is_first: bool,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
     if is_first:
         return ensure_length_exact(window_audio, TARGET_LEN_SAMPLES)
     shifted = randomlyShiftAudioStartTime(
-        window_audio, minShiftBy=0.001, maxShiftBy=0.07, total_time=WINDOW_TIME, sr=SR
+        window_audio,
+        minShiftBy=0.001,
+        maxShiftBy=0.07,
+        total_time=WINDOW_TIME,
+        sr=SR,
+        rng=rng,
     )
     return ensure_length_exact(shifted, TARGET_LEN_SAMPLES)
 
@@ -167,35 +362,41 @@ def _match_length(arr: np.ndarray, target_len: int) -> np.ndarray:
 # ---------------------------
 # Core single-sample generation
 # ---------------------------
-def generate_single(sample_id: int, output_dir: str) -> Dict:
+def build_scene_tracks(
+    sample_id: int, rng: np.random.Generator
+) -> Tuple[List[TrackObject], List[str], List]:
+    """
+    Draw the random sources of one sample from ``rng``.
+    Returns (tracks, class_list, coords_list) with one entry per source.
+    """
     class_keys = list(CLASS_CSV_MAP.keys())
-    target_clips = np.random.randint(1, min(MAX_CLIPS_PER_SAMPLE, len(class_keys)) + 1)
+    target_clips = myRand.randint(
+        1, min(MAX_CLIPS_PER_SAMPLE, len(class_keys)) + 1, rng
+    )
 
     # Apply class weights for selection
     weights = np.array([CLASS_WEIGHTS.get(k, 1.0) for k in class_keys])
     weights = weights / weights.sum()  # Normalize to probabilities
     selected_keys = list(
-        np.random.choice(class_keys, size=target_clips, replace=False, p=weights)
+        rng.choice(class_keys, size=target_clips, replace=False, p=weights)
     )
 
     tracks = []
     class_list = []
-    x_list = []
-    y_list = []
-    z_list = []
+    coords_list = []
 
     for idx, class_key in enumerate(selected_keys):
         try:
-            audio, sr, class_name = get_random_clip_from_class(class_key)
-
             # Extract window
-            window_audio = getRandomTimeWindow(audio, WINDOW_TIME, SR)
+            window_audio, class_name = get_random_window_from_class(class_key, rng=rng)
             window_audio = ensure_length_exact(window_audio, TARGET_LEN_SAMPLES)
-            shifted_audio = apply_random_start_shift(window_audio, is_first=(idx == 0))
+            shifted_audio = apply_random_start_shift(
+                window_audio, is_first=(idx == 0), rng=rng
+            )
 
-            azimuth = myRand.pick_random_from_range(-180, 180)
-            elevation = myRand.pick_random_from_range(-80, 81)
-            level = np.random.uniform(0.6, 1.0)
+            azimuth = myRand.pick_random_from_range(-180, 180, rng)
+            elevation = myRand.pick_random_from_range(-80, 81, rng)
+            level = myRand.uniform(0.6, 1.0, rng)
 
             track = TrackObject(
                 name=f"source_{idx}",
@@ -206,71 +407,508 @@ def generate_single(sample_id: int, output_dir: str) -> Dict:
                 audio=shifted_audio,
             )
             coords = azel_to_cartesian(azimuth, elevation, az_from="north")
-            x = coords[0]
-            y = coords[1]
-            z = coords[2]
             tracks.append(track)
             class_list.append(class_name)
-            x_list.append(x)
-            y_list.append(y)
-            z_list.append(z)
+            coords_list.append(coords)
         except Exception as e:
             print(f"[Worker] Error clip {idx} sample {sample_id}: {e}")
             continue
 
-    if not tracks:
-        return {}
+    return tracks, class_list, coords_list
 
-    try:
-        binaural = mix_tracks_binaural(
-            tracks=tracks,
-            subject_id="D1",
-            sample_rate=SR,
-            ir_type="HRIR",
-            speaker_layout="none",
-            mode="auto",
-        )  # shape (2, N)
-    except Exception as e:
-        print(f"[Worker] Binaural mix error sample {sample_id}: {e}")
-        return {}
 
-    # Ambient addition
+def add_ambient(binaural: np.ndarray, sample_id: int, rng: np.random.Generator) -> None:
+    """Add a random ambient bed at -25..-45 dB RMS to both ears, in place."""
     try:
         b_len = binaural.shape[1]
-        ambient = get_random_ambient_window(window_time=b_len / SR, sr=SR)
+        ambient = get_random_ambient_window(window_time=b_len / SR, sr=SR, rng=rng)
         ambient = _match_length(ambient, b_len).astype(np.float32)
         if np.any(ambient):
-            noise_db = -myRand.pick_random_from_range(25, 46)  # -25..-45
+            noise_db = -myRand.pick_random_from_range(25, 46, rng)  # -25..-45
             ambient = scale_to_rms_db(ambient, noise_db)
             binaural[0, :] += ambient
             binaural[1, :] += ambient
     except Exception as e:
         print(f"[Worker] Ambient add error sample {sample_id}: {e}")
 
-    # Save file
-    fname = f"sample_{sample_id:04d}.wav"
-    fpath = os.path.join(output_dir, fname)
+
+@lru_cache(maxsize=None)
+def get_codec_backend() -> str:
+    """
+    The Opus backend this process codes with, resolved and smoke-tested (a round
+    trip of 20 ms of silence) once per worker. Raises RuntimeError if it can't code,
+    so a codec stage that was asked for never silently writes clean audio.
+    """
+    backend = CODEC_BACKEND
+    resolved = resolve_opus_backend(backend)
     try:
-        sf.write(fpath, binaural.T, SR)
+        opus_round_trip(np.zeros((int(0.02 * SR), 2), dtype=np.float32), SR, CODEC_BITRATES[0], resolved)
     except Exception as e:
-        print(f"[Worker] Write error {fpath}: {e}")
-        return {}
+        raise RuntimeError(
+            f"Opus backend '{resolved}' (CODEC_BACKEND='{backend}') does not work here: {e}. "
+            "Fix it, pick another CODEC_BACKEND, or run with codec_probability=0."
+        ) from e
+    return resolved
 
-    return {
-        "name_file": fname,
-        "classes": ",".join(class_list),
-        "x": ",".join(map(str, x_list)),
-        "y": ",".join(map(str, y_list)),
-        "z": ",".join(map(str, z_list)),
+
+def apply_codec(
+    binaural: np.ndarray,
+    sample_id: int,
+    seed: int = SEED,
+    probability: float = CODEC_PROBABILITY,
+) -> int:
+    """
+    Opus encode/decode ``binaural`` (2, N) in place, with ``probability``, at a bitrate
+    drawn from the sample's codec generator. Returns the bitrate in kbps, 0 if the
+    sample was left clean. Codec failures raise instead of writing the sample clean
+    under a bitrate that was never applied.
+    """
+    if probability <= 0:
+        return 0
+    rng = myRand.sample_rng(seed, sample_id, CODEC_RNG_STREAM)
+    if rng.random() >= probability:
+        return 0
+    bitrate = int(rng.choice(CODEC_BITRATES))
+    binaural[:] = opus_round_trip(binaural.T, SR, bitrate, get_codec_backend()).T
+    return bitrate
+
+
+# ---------------------------
+# Output writers (one per process and output dir)
+# ---------------------------
+_writers: Dict[Tuple[str, str], object] = {}
+_background: Optional[BackgroundWriter] = None
+
+
+def get_background_writer() -> Optional[BackgroundWriter]:
+    global _background
+    if not BACKGROUND_WRITES:
+        return None
+    if _background is None:
+        _background = BackgroundWriter(WRITE_QUEUE_SIZE, name="sample-writer")
+        # Runs after the writers' finalizers (lower priority), draining their last jobs
+        Finalize(_background, _background.close, exitpriority=5)
+    return _background
+
+
+def get_writer(output_dir: str, output_format: str = OUTPUT_FORMAT):
+    key = (output_dir, output_format)
+    writer = _writers.get(key)
+    if writer is None:
+        writer = make_writer(
+            output_format,
+            output_dir,
+            SR,
+            shard_size=SHARD_SIZE,
+            background=get_background_writer(),
+        )
+        _writers[key] = writer
+        # Pool workers flush their partly filled shard when they exit
+        Finalize(writer, writer.close, exitpriority=10)
+    return writer
+
+
+def close_writers() -> List[Exception]:
+    """Flush and close this process's writers. Returns the errors of its failed writes."""
+    global _background
+    for writer in _writers.values():
+        writer.close()
+    _writers.clear()
+    errors: List[Exception] = []
+    if _background is not None:
+        _background.close()
+        errors = _background.take_errors()
+        _background = None
+    return errors
+
+
+def take_write_errors() -> List[Exception]:
+    """Errors of this process's background writes since the last call."""
+    if _background is None:
+        return []
+    return _background.take_errors()
+
+
+# Seconds a pool worker waits in its final close task for the other workers
+WORKER_CLOSE_TIMEOUT = 600
+# Set in pool workers by init_worker
+_close_barrier = None
+
+
+def init_worker(close_barrier) -> None:
+    global _close_barrier
+    _close_barrier = close_barrier
+
+
+def close_worker_writers(_task=None) -> List[Exception]:
+    """Pool task run once per worker at the end of a run: close its writers and return their errors."""
+    errors = close_writers()
+    # Hold this worker until every worker has its close task, so none runs two
+    _close_barrier.wait(timeout=WORKER_CLOSE_TIMEOUT)
+    return errors
+
+
+def write_sample(
+    sample_id: int,
+    binaural: np.ndarray,
+    class_list: List[str],
+    coords_list: List,
+    output_dir: str,
+    output_format: str = OUTPUT_FORMAT,
+    codec_bitrate: int = 0,
+) -> Dict:
+    """Write one rendered sample and return its metadata row ({} on failure)."""
+    metadata = {
+        "classes": list(class_list),
+        "x": [float(c[0]) for c in coords_list],
+        "y": [float(c[1]) for c in coords_list],
+        "z": [float(c[2]) for c in coords_list],
         "num_classes": len(class_list),
+        "codec_bitrate": codec_bitrate,
     }
+    try:
+        location = get_writer(output_dir, output_format).write(
+            sample_id, binaural, metadata
+        )
+    except Exception as e:
+        print(f"[Worker] Write error sample {sample_id} in {output_dir}: {e}")
+        return {}
+
+    return {"sample_id": sample_id, **location, **metadata}
+
+
+def render_sample(
+    sample_id: int, seed: int = SEED
+) -> Optional[Tuple[np.ndarray, List[str], List]]:
+    """
+    Render one sample in memory.
+    Returns (binaural (2, N), class_list, coords_list), or None if it failed.
+    """
+    rng = myRand.sample_rng(seed, sample_id)
+    tracks, class_list, coords_list = build_scene_tracks(sample_id, rng)
+    if not tracks:
+        return None
+
+    try:
+        binaural = mix_tracks_binaural(
+            tracks=tracks,
+            subject_id=SUBJECT_ID,
+            sample_rate=SR,
+            ir_type=IR_TYPE,
+            speaker_layout="none",
+            mode="auto",
+        )  # shape (2, N)
+    except Exception as e:
+        print(f"[Worker] Binaural mix error sample {sample_id}: {e}")
+        return None
+
+    add_ambient(binaural, sample_id, rng)
+    return binaural, class_list, coords_list
+
+
+def generate_single(
+    sample_id: int,
+    output_dir: str,
+    output_format: str = OUTPUT_FORMAT,
+    seed: int = SEED,
+    codec_probability: float = CODEC_PROBABILITY,
+) -> Dict:
+    rendered = render_sample(sample_id, seed)
+    if rendered is None:
+        return {}
+    binaural, class_list, coords_list = rendered
+    codec_bitrate = apply_codec(binaural, sample_id, seed, codec_probability)
+    return write_sample(
+        sample_id, binaural, class_list, coords_list, output_dir, output_format, codec_bitrate
+    )
+
+
+# ---------------------------
+# Batched generation
+# ---------------------------
+def render_batch(
+    sample_ids: List[int], seed: int = SEED
+) -> List[Tuple[int, np.ndarray, List[str], List]]:
+    """
+    Render several samples in memory with one vectorized render.
+    Returns (sample_id, binaural (2, N), class_list, coords_list) per sample
+    that rendered; failed ids are left out.
+
+    The sources of all scenes are stacked into a (B, K, N) block, their blended
+    IRs are gathered from the in-memory IR bank in one indexed read and the
+    whole batch is convolved with a single batched FFT, summing over K.
+    Every sample draws from its own generator, so a sample's scene does not
+    depend on which batch it lands in.
+    """
+    scenes = []
+    for sample_id in sample_ids:
+        rng = myRand.sample_rng(seed, sample_id)
+        tracks, class_list, coords_list = build_scene_tracks(sample_id, rng)
+        if not tracks:
+            continue
+        try:
+            ir_rows = [
+                resolve_sadie_ir_rows(
+                    SUBJECT_ID, SR, IR_TYPE, "none", t.azimuth, t.elevation, mode="auto"
+                )
+                for t in tracks
+            ]
+        except Exception as e:
+            print(f"[Worker] Binaural mix error sample {sample_id}: {e}")
+            continue
+        scenes.append((sample_id, rng, tracks, ir_rows, class_list, coords_list))
+
+    if not scenes:
+        return []
+
+    # Pack the batch; empty source slots keep zero audio, level and IR weight
+    n_scenes = len(scenes)
+    audio = np.zeros((n_scenes, MAX_CLIPS_PER_SAMPLE, TARGET_LEN_SAMPLES), dtype=np.float32)
+    levels = np.zeros((n_scenes, MAX_CLIPS_PER_SAMPLE))
+    rows = np.zeros((n_scenes, MAX_CLIPS_PER_SAMPLE, 3), dtype=np.int64)
+    ir_weights = np.zeros((n_scenes, MAX_CLIPS_PER_SAMPLE, 3))
+    for b, (_, _, tracks, ir_rows, _, _) in enumerate(scenes):
+        for k, (track, (track_rows, track_weights)) in enumerate(zip(tracks, ir_rows)):
+            audio[b, k] = track.audio
+            levels[b, k] = track.level
+            rows[b, k, : len(track_rows)] = track_rows
+            ir_weights[b, k, : len(track_weights)] = track_weights
+
+    irs = gather_sadie_irs(SUBJECT_ID, SR, IR_TYPE, rows, ir_weights)
+    mixes = convolve_binaural_batch(audio, irs, levels)  # shape (B, 2, N)
+
+    rendered = []
+    for (sample_id, rng, _, _, class_list, coords_list), binaural in zip(scenes, mixes):
+        add_ambient(binaural, sample_id, rng)
+        rendered.append((sample_id, binaural, class_list, coords_list))
+    return rendered
+
+
+def generate_batch(
+    sample_ids: List[int],
+    output_dir: str,
+    output_format: str = OUTPUT_FORMAT,
+    seed: int = SEED,
+    codec_probability: float = CODEC_PROBABILITY,
+) -> List[Dict]:
+    """Generate several samples with one vectorized render (see render_batch)."""
+    results = []
+    for sample_id, binaural, class_list, coords_list in render_batch(sample_ids, seed):
+        codec_bitrate = apply_codec(binaural, sample_id, seed, codec_probability)
+        md = write_sample(
+            sample_id, binaural, class_list, coords_list, output_dir, output_format, codec_bitrate
+        )
+        if md:
+            results.append(md)
+    return results
+
+
+def generate_chunk(
+    sample_ids: List[int],
+    output_dir: str,
+    batched: bool,
+    output_format: str = OUTPUT_FORMAT,
+    seed: int = SEED,
+    codec_probability: float = CODEC_PROBABILITY,
+) -> Tuple[List[Dict], List[Exception]]:
+    """Pool task: generate a group of ids, vectorized or one by one.
+
+    Returns the metadata rows and the errors of the background writes that failed
+    in this process since its previous task.
+    """
+    if batched:
+        results = generate_batch(sample_ids, output_dir, output_format, seed, codec_probability)
+    else:
+        results = []
+        for sample_id in sample_ids:
+            md = generate_single(sample_id, output_dir, output_format, seed, codec_probability)
+            if md:
+                results.append(md)
+    return results, take_write_errors()
+
+
+# ---------------------------
+# Static sharding across machines
+# ---------------------------
+PART_INFO_FILE = "part.json"
+_PART_DIR_RE = re.compile(r"^part-(\d{5})-of-(\d{5})$")
+
+
+def part_dir_name(shard_index: int, num_shards: int) -> str:
+    return f"part-{shard_index:05d}-of-{num_shards:05d}"
+
+
+def shard_id_range(dataset_size: int, shard_index: int, num_shards: int) -> range:
+    """Contiguous block of sample ids owned by one shard; blocks cover 0..dataset_size-1 exactly."""
+    if num_shards < 1 or not 0 <= shard_index < num_shards:
+        raise ValueError(
+            f"Invalid shard {shard_index} of {num_shards} (need 0 <= shard_index < num_shards)"
+        )
+    return range(
+        shard_index * dataset_size // num_shards,
+        (shard_index + 1) * dataset_size // num_shards,
+    )
+
+
+def merge_shards(output_dir: str, metadata_format: str = METADATA_FORMAT) -> pd.DataFrame:
+    """
+    Merge the part-XXXXX-of-YYYYY directories of a sharded build into one
+    metadata file in ``output_dir``. File names are rewritten relative to
+    ``output_dir``. Raises ValueError if parts, sample ids or settings don't line up.
+    """
+    parts = []
+    for name in sorted(os.listdir(output_dir)):
+        if _PART_DIR_RE.match(name) and os.path.isdir(os.path.join(output_dir, name)):
+            with open(os.path.join(output_dir, name, PART_INFO_FILE), "r", encoding="utf-8") as f:
+                parts.append((name, json.load(f)))
+    if not parts:
+        raise ValueError(f"No part directories found in {output_dir}")
+
+    settings = {(p["num_shards"], p["dataset_size"], p["seed"]) for _, p in parts}
+    if len(settings) != 1:
+        raise ValueError(f"Parts disagree on (num_shards, dataset_size, seed): {sorted(settings)}")
+    num_shards, dataset_size, seed = settings.pop()
+
+    problems = []
+    missing_parts = sorted(set(range(num_shards)) - {p["shard_index"] for _, p in parts})
+    if missing_parts:
+        problems.append(f"missing parts {missing_parts}")
+
+    frames = []
+    for name, _ in parts:
+        df = read_metadata(os.path.join(output_dir, name))
+        if df.empty:
+            problems.append(f"{name} has no metadata")
+            continue
+        df["name_file"] = [os.path.join(name, f) for f in df["name_file"]]
+        frames.append(df)
+
+    merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    ids = merged["sample_id"] if not merged.empty else pd.Series(dtype=np.int64)
+    duplicates = sorted(ids[ids.duplicated()].unique())
+    gaps = sorted(set(range(dataset_size)) - set(ids))
+    out_of_range = sorted(i for i in set(ids) if not 0 <= i < dataset_size)
+    if duplicates:
+        problems.append(f"{len(duplicates)} duplicate sample ids (first: {duplicates[:10]})")
+    if gaps:
+        problems.append(f"{len(gaps)} missing sample ids (first: {gaps[:10]})")
+    if out_of_range:
+        problems.append(f"{len(out_of_range)} sample ids outside 0..{dataset_size - 1}")
+    if problems:
+        raise ValueError(f"Cannot merge {output_dir}: " + "; ".join(problems))
+
+    merged = merged.sort_values("sample_id", kind="stable").reset_index(drop=True)
+    remove_metadata(output_dir)
+    make_metadata_writer(metadata_format, output_dir).append(merged.to_dict("records"))
+    print(
+        f"Merged {num_shards} parts into {metadata_format} metadata in {output_dir}: "
+        f"{len(merged)} samples (seed={seed}), no gaps or duplicates"
+    )
+    return merged
 
 
 # ---------------------------
-# Multiprocessing helpers
+# Resume: reconcile metadata with the files on disk
 # ---------------------------
-def _init_worker(seed_base: int):
-    np.random.seed(seed_base + os.getpid())
+_SAMPLE_WAV_RE = re.compile(r"^sample_(\d+)\.wav$")
+
+
+def _read_metadata_rows(output_dir: str) -> pd.DataFrame:
+    """Metadata written so far, in either format, with a sample_id for every row."""
+    df = read_metadata(output_dir)
+    if df.empty:
+        return df
+    if "sample_id" not in df.columns:
+        # Metadata written before sample_id was recorded: recover it from the file name
+        ids = df["name_file"].astype(str).str.extract(r"sample_(\d+)\.wav$")[0]
+        df.insert(0, "sample_id", pd.to_numeric(ids, errors="coerce"))
+    df = df.dropna(subset=["sample_id", "name_file"])
+    df["sample_id"] = df["sample_id"].astype(np.int64)
+    return df
+
+
+def _shard_lengths(output_dir: str) -> Dict[str, int]:
+    return {
+        os.path.basename(path): np.load(path, mmap_mode="r").shape[0]
+        for path in list_shards(output_dir)
+    }
+
+
+def _audio_exists_check(output_dir: str, shard_lengths: Dict[str, int]):
+    """Predicate telling whether a metadata row points at audio that is on disk."""
+
+    def audio_exists(row: Dict) -> bool:
+        name = str(row["name_file"])
+        if name.endswith(".npy"):
+            offset = row.get("shard_offset")
+            return (
+                name in shard_lengths
+                and offset == offset  # not NaN
+                and 0 <= int(offset) < shard_lengths[name]
+            )
+        return os.path.exists(os.path.join(output_dir, name))
+
+    return audio_exists
+
+
+def reconcile_output(output_dir: str, id_range: range) -> Tuple[List[Dict], List[int]]:
+    """
+    Work out what a previous run of ``output_dir`` actually finished.
+
+    A sample counts as done when its metadata row points at audio that exists
+    (a WAV file, or a slot of a complete .npy shard). Rows for missing audio and
+    duplicate rows are dropped. Shards flushed after the last metadata flush are
+    recovered from their JSON sidecars; WAVs without a metadata row and
+    half-written WAV and shard files are deleted so those ids are rendered again.
+
+    Returns (rows_to_keep, missing_ids) with the kept rows ordered by sample id.
+    """
+    df = _read_metadata_rows(output_dir)
+    rows = df.to_dict("records") if not df.empty else []
+
+    shard_lengths = _shard_lengths(output_dir)
+    audio_exists = _audio_exists_check(output_dir, shard_lengths)
+
+    kept: Dict[int, Dict] = {}
+    for row in rows:
+        sample_id = int(row["sample_id"])
+        if sample_id in id_range and sample_id not in kept and audio_exists(row):
+            kept[sample_id] = row
+
+    # Shards that reached disk after the last metadata flush
+    recovered = 0
+    for name in shard_lengths:
+        sidecar = os.path.join(output_dir, name[: -len(".npy")] + ".json")
+        if not os.path.exists(sidecar):
+            continue
+        with open(sidecar, "r", encoding="utf-8") as f:
+            shard_rows = json.load(f)["samples"]
+        for shard_row in shard_rows:
+            sample_id = int(shard_row["sample_id"])
+            if sample_id in id_range and sample_id not in kept:
+                kept[sample_id] = {
+                    "sample_id": sample_id,
+                    "name_file": shard_row["name_file"],
+                    "shard_offset": shard_row["shard_offset"],
+                    **{k: v for k, v in shard_row.items() if k not in ("sample_id", "name_file", "shard_offset")},
+                }
+                recovered += 1
+
+    # Orphans: WAVs nobody points at and audio files that never completed
+    referenced = {str(row["name_file"]) for row in kept.values()}
+    orphans = 0
+    for name in os.listdir(output_dir):
+        if (_SAMPLE_WAV_RE.match(name) and name not in referenced) or name.endswith((".npy.tmp", ".wav.tmp")):
+            os.remove(os.path.join(output_dir, name))
+            orphans += 1
+
+    missing = [i for i in id_range if i not in kept]
+    print(
+        f"Resuming: {len(kept)} samples complete ({recovered} recovered from shard sidecars, "
+        f"{len(rows) - (len(kept) - recovered)} stale metadata rows dropped, "
+        f"{orphans} orphaned files removed), {len(missing)} to generate."
+    )
+    return [kept[i] for i in sorted(kept)], missing
 
 
 # ---------------------------
@@ -284,24 +922,51 @@ def create_dataset(
     chunk_size: int = 1,
     flush_every: int = 1000,  # >>> ADDED
     resume: bool = False,  # >>> ADDED (optional resume)
+    batch_size: int = 1,  # >1 renders that many samples per task with generate_batch
+    output_format: str = OUTPUT_FORMAT,  # "wav" or "npy" shards
+    seed: int = SEED,  # root seed; sample i always renders from (seed, i)
+    metadata_format: str = METADATA_FORMAT,  # "parquet" or "csv"
+    shard_index: int = 0,  # with num_shards > 1, render only this slice of ids
+    num_shards: int = 1,  # into output_dir/part-XXXXX-of-YYYYY (see merge_shards)
+    codec_probability: float = CODEC_PROBABILITY,  # share of samples given an Opus round trip
 ):
+    id_range = shard_id_range(dataset_size, shard_index, num_shards)
+    if num_shards > 1:
+        output_dir = os.path.join(output_dir, part_dir_name(shard_index, num_shards))
+        print(
+            f"Shard {shard_index}/{num_shards}: sample ids "
+            f"{id_range.start}..{id_range.stop - 1} -> {output_dir}"
+        )
     os.makedirs(output_dir, exist_ok=True)
+    if num_shards > 1:
+        with open(os.path.join(output_dir, PART_INFO_FILE), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "shard_index": shard_index,
+                    "num_shards": num_shards,
+                    "dataset_size": dataset_size,
+                    "seed": seed,
+                    "first_id": id_range.start,
+                    "stop_id": id_range.stop,
+                },
+                f,
+            )
+    target_count = len(id_range)
 
-    csv_path = os.path.join(output_dir, "dataset_metadata.csv")
+    # Every row also records which shard produced it and the root seed
+    run_columns = {"shard": shard_index, "seed": seed}
 
-    # Resume logic
+    # Resume logic: schedule exactly the ids whose output is not on disk
     total_written = 0
-    if resume and os.path.exists(csv_path):
-        try:
-            # Fast line count (excluding header)
-            with open(csv_path, "r", encoding="utf-8") as f:
-                total_written = sum(1 for _ in f) - 1
-            print(f"Resuming: detected {total_written} existing rows in metadata CSV.")
-        except Exception:
-            total_written = 0
-    else:
-        if os.path.exists(csv_path):
-            os.remove(csv_path)
+    indices = list(id_range)
+    kept: List[Dict] = []
+    if resume:
+        kept, indices = reconcile_output(output_dir, id_range)
+        total_written = len(kept)
+    # Rewrite the metadata as the reconciled rows without ever deleting it first:
+    # with no metadata the next resume would take every finished WAV for an orphan
+    replace_metadata(metadata_format, output_dir, [{**row, **run_columns} for row in kept])
+    metadata_sink = make_metadata_writer(metadata_format, output_dir)
 
     # Validate CSV resources
     missing = [k for k, (d, c) in CLASS_CSV_MAP.items() if not os.path.exists(c)]
@@ -309,25 +974,26 @@ def create_dataset(
         print(f"Warning: Missing CSVs for: {missing}. They will never appear.")
     ensure_ambient_csv()
 
-    indices = list(range(total_written, dataset_size))  # skip already done if resuming
+    if codec_probability > 0:
+        # Fail before rendering anything if the codec stage can't run
+        print(f"Codec stage: {codec_probability:.0%} of samples through Opus ({get_codec_backend()} backend)")
+
+    batch_size = max(1, batch_size)
+    tasks = [indices[i : i + batch_size] for i in range(0, len(indices), batch_size)]
     buffer: List[Dict] = []
 
     def flush_buffer(final=False):
         nonlocal buffer, total_written
         if not buffer:
             return
-        df = pd.DataFrame(buffer)
-        write_header = total_written == 0 and not (resume and os.path.exists(csv_path))
-        df.to_csv(
-            csv_path,
-            mode="a",
-            header=write_header,
-            index=False,
+        # The append runs on the metadata writer thread, off the result loop
+        metadata_writer.submit(
+            metadata_sink.append, [{**md, **run_columns} for md in buffer]
         )
         total_written += len(buffer)
         print(
-            f"Flushed {len(buffer)} records to CSV "
-            f"(total written: {total_written}/{dataset_size})"
+            f"Flushed {len(buffer)} records to {metadata_format} "
+            f"(total written: {total_written}/{target_count})"
         )
         buffer = []
         if final:
@@ -337,67 +1003,148 @@ def create_dataset(
         print("Nothing to do (all samples already generated).")
         return
 
+    metadata_writer = BackgroundWriter(max_pending=4, name="metadata-writer")
+    audio_errors: List[Exception] = []
+
     if parallel:
         if processes is None:
             processes = max(1, mp.cpu_count() - 1)
         print(
             f"Starting multiprocessing with {processes} processes "
-            f"(resume={resume}, starting at {total_written})..."
+            f"(resume={resume}, {len(indices)} samples to generate, seed={seed})..."
         )
 
         from functools import partial
 
-        worker_fn = partial(generate_single, output_dir=output_dir)
+        worker_fn = partial(
+            generate_chunk,
+            output_dir=output_dir,
+            batched=batch_size > 1,
+            output_format=output_format,
+            seed=seed,
+            codec_probability=codec_probability,
+        )
 
-        with mp.Pool(
-            processes=processes,
-            initializer=_init_worker,
-            initargs=(np.random.randint(0, 10_000_000),),
-        ) as pool:
-            for md in pool.imap_unordered(worker_fn, indices, chunksize=chunk_size):
-                if md:
+        close_barrier = mp.Barrier(processes)
+        with mp.Pool(processes=processes, initializer=init_worker, initargs=(close_barrier,)) as pool:
+            for mds, errors in pool.imap_unordered(worker_fn, tasks, chunksize=chunk_size):
+                audio_errors.extend(errors)
+                for md in mds:
                     buffer.append(md)
                     if len(buffer) >= flush_every:
                         flush_buffer()
-                # Optional progress print
-                if (total_written + len(buffer)) % 100 == 0:
-                    print(
-                        f"Progress: {total_written + len(buffer)}/{dataset_size} (in-memory buffer size={len(buffer)})"
-                    )
+                    # Optional progress print
+                    if (total_written + len(buffer)) % 100 == 0:
+                        print(
+                            f"Progress: {total_written + len(buffer)}/{target_count} (in-memory buffer size={len(buffer)})"
+                        )
+            # One close task per worker flushes its open shard and reports the last write errors
+            for errors in pool.map(close_worker_writers, range(processes), chunksize=1):
+                audio_errors.extend(errors)
+            pool.close()
+            pool.join()
     else:
-        for sid in indices:
-            md = generate_single(sid, output_dir)
-            if md:
-                buffer.append(md)
-            if (sid + 1) % 100 == 0:
-                print(f"Progress: {sid + 1}/{dataset_size} (buffer size={len(buffer)})")
+        for task in tasks:
+            mds, errors = generate_chunk(
+                task, output_dir, batch_size > 1, output_format, seed, codec_probability
+            )
+            buffer.extend(mds)
+            audio_errors.extend(errors)
+            done = task[-1] + 1 - id_range.start
+            if done % 100 < len(task):
+                print(f"Progress: {done}/{target_count} (buffer size={len(buffer)})")
             if len(buffer) >= flush_every:
                 flush_buffer()
 
-    # Final flush
+        audio_errors.extend(close_writers())
+
+    # Final flush; closing the sink merges the Parquet parts of the run into one file
     flush_buffer(final=True)
+    metadata_writer.submit(metadata_sink.close)
+    metadata_writer.close()
 
-    # Compute stats (read entire CSV once)
-    if os.path.exists(csv_path):
-        try:
-            full_df = pd.read_csv(csv_path)
-            if not full_df.empty:
-                print(f"Metadata at: {csv_path}")
-                print(
-                    f"Total rows: {len(full_df)} | Avg classes/sample: {full_df['num_classes'].mean():.2f}"
-                )
-        except Exception as e:
-            print(f"Could not compute final stats: {e}")
+    # Compute stats (read the metadata once)
+    full_df = pd.DataFrame()
+    try:
+        full_df = read_metadata(output_dir)
+        if not full_df.empty:
+            print(f"Metadata ({metadata_format}) at: {output_dir}")
+            print(
+                f"Total rows: {len(full_df)} | Avg classes/sample: {full_df['num_classes'].mean():.2f}"
+            )
+    except Exception as e:
+        print(f"Could not compute final stats: {e}")
+
+    # Writes run in the background (in pool workers too), so failures only show up
+    # here: as writer errors, or as metadata rows whose audio never reached the disk
+    problems = []
+    if metadata_writer.errors:
+        problems.append(
+            f"{len(metadata_writer.errors)} metadata appends failed (first: {metadata_writer.errors[0]})"
+        )
+    if audio_errors:
+        problems.append(f"{len(audio_errors)} audio writes failed (first: {audio_errors[0]})")
+    if not full_df.empty:
+        audio_exists = _audio_exists_check(output_dir, _shard_lengths(output_dir))
+        lost = [int(row["sample_id"]) for row in full_df.to_dict("records") if not audio_exists(row)]
+        if lost:
+            problems.append(f"{len(lost)} metadata rows have no audio (first ids: {sorted(lost)[:10]})")
+    if problems:
+        raise RuntimeError(
+            f"Dataset in {output_dir} is incomplete: " + "; ".join(problems)
+            + ". Run again with resume=True to render the affected samples."
+        )
 
 
 if __name__ == "__main__":
-    np.random.seed(2003)
-    create_dataset(
-        dataset_size=50,
-        output_dir="output/dataset_parallel",
-        parallel=True,
-        processes=None,
-        chunk_size=1,
-        flush_every=50,
-        resume=False,  # set True if you want to continue a previous run
+    parser = argparse.ArgumentParser(
+        description="Generate the augmented binaural dataset, or merge a sharded build."
     )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["generate", "merge"],
+        default="generate",
+        help="'generate' (default) renders samples, 'merge' joins part directories.",
+    )
+    parser.add_argument("--out", default="output/dataset_parallel", help="Output directory.")
+    parser.add_argument("--size", type=int, default=50, help="Total number of samples in the dataset.")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"Root seed. Default: {SEED}")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes. Default: CPU count - 1")
+    parser.add_argument("--serial", action="store_true", help="Render in this process only.")
+    parser.add_argument("--batch-size", type=int, default=1, help="Samples per vectorized render.")
+    parser.add_argument("--format", choices=["wav", "npy"], default=OUTPUT_FORMAT, help="Output format.")
+    parser.add_argument(
+        "--metadata-format", choices=["parquet", "csv"], default=METADATA_FORMAT, help="Metadata format."
+    )
+    parser.add_argument("--flush-every", type=int, default=50, help="Metadata rows per metadata flush (CSV append or Parquet part).")
+    parser.add_argument("--resume", action="store_true", help="Continue a previous run.")
+    parser.add_argument("--shard-index", type=int, default=0, help="Index of this machine's shard.")
+    parser.add_argument("--num-shards", type=int, default=1, help="Total number of shards.")
+    parser.add_argument(
+        "--codec-probability",
+        type=float,
+        default=CODEC_PROBABILITY,
+        help="Share of samples Opus encoded/decoded at a random bitrate. Default: 0 (off)",
+    )
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        merge_shards(args.out, args.metadata_format)
+    else:
+        create_dataset(
+            dataset_size=args.size,
+            output_dir=args.out,
+            parallel=not args.serial,
+            processes=args.processes,
+            chunk_size=1,
+            flush_every=args.flush_every,
+            resume=args.resume,
+            batch_size=args.batch_size,
+            output_format=args.format,
+            seed=args.seed,
+            metadata_format=args.metadata_format,
+            shard_index=args.shard_index,
+            num_shards=args.num_shards,
+            codec_probability=args.codec_probability,
+        )
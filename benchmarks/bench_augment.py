@@ -0,0 +1,56 @@
+"""
+End-to-end dataset generation throughput (augment.create_dataset) against the
+synthetic clip corpus, for a range of worker process counts.
+"""
+
+from benchmarks.fixtures import ensure_corpus_fixture, ensure_sadie_fixture
+
+# Must point BINAMIX_SADIE_PATH somewhere before binamix.sadie_utilities is imported
+ensure_sadie_fixture()
+
+import os
+import time
+import shutil
+import tempfile
+import augment
+
+N_SAMPLES = 64
+
+
+class CreateDataset:
+    params = ([1, 2, 4], [1, 16])
+    param_names = ["processes", "batch_size"]
+    timeout = 600
+
+    def setup(self, processes, batch_size):
+        self.root = ensure_corpus_fixture()
+        self.cwd = os.getcwd()
+        # augment resolves its clip folders and CSVs relative to the working directory
+        os.chdir(self.root)
+        augment.get_corpus.cache_clear()
+        self.output_dir = tempfile.mkdtemp(prefix="binamix-bench-out-")
+
+    def teardown(self, processes, batch_size):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def _create(self, processes, batch_size):
+        augment.create_dataset(
+            dataset_size=N_SAMPLES,
+            output_dir=self.output_dir,
+            parallel=processes > 1,
+            processes=processes,
+            flush_every=N_SAMPLES,
+            batch_size=batch_size,
+            metadata_format="csv",
+        )
+
+    def time_create_dataset(self, processes, batch_size):
+        self._create(processes, batch_size)
+
+    def track_samples_per_second(self, processes, batch_size):
+        t0 = time.perf_counter()
+        self._create(processes, batch_size)
+        return N_SAMPLES / (time.perf_counter() - t0)
+
+    track_samples_per_second.unit = "samples/s"
@@ -0,0 +1,111 @@
+"""
+asv-style benchmarks of the binamix rendering functions. Every class has
+``params``/``param_names``, an optional ``setup`` and ``time_*`` methods, so
+the suite runs under asv or with ``python -m benchmarks.run``.
+"""
+
+from benchmarks.fixtures import ensure_sadie_fixture
+
+# Must point BINAMIX_SADIE_PATH somewhere before binamix.sadie_utilities is imported
+ensure_sadie_fixture()
+
+import numpy as np
+from binamix import sadie_utilities as su
+from binamix.surround_utilities import compile_layout
+
+SUBJECT = "D1"
+SR = 44100
+
+# Off-grid direction, so the interpolation modes have real work to do
+AZIMUTH = 37
+ELEVATION = 12
+
+
+def _noise(seconds, seed=0):
+    return np.random.default_rng(seed).standard_normal(int(seconds * SR)).astype(np.float32) * 0.1
+
+
+class LoadSadieIR:
+    params = ["HRIR", "BRIR"]
+    param_names = ["ir_type"]
+
+    def time_load_sadie_ir(self, ir_type):
+        su.load_sadie_ir(SUBJECT, SR, ir_type, 90, 0)
+
+    def time_load_sadie_ir_bank_cold(self, ir_type):
+        su.load_sadie_ir_bank.cache_clear()
+        su.load_sadie_ir_bank(SUBJECT, SR, ir_type)
+
+
+class GenerateSadieIR:
+    params = (["auto", "nearest", "planar", "two_point", "three_point"], ["none", "7.1.4"])
+    param_names = ["mode", "speaker_layout"]
+
+    def setup(self, mode, speaker_layout):
+        # Warm the angle listings and compiled layouts; the IR files are read every call
+        su.generate_sadie_ir(SUBJECT, SR, "HRIR", speaker_layout, AZIMUTH, ELEVATION, mode=mode, verbose=False)
+
+    def time_generate_sadie_ir(self, mode, speaker_layout):
+        su.generate_sadie_ir(SUBJECT, SR, "HRIR", speaker_layout, AZIMUTH, ELEVATION, mode=mode, verbose=False)
+
+
+class RenderSource:
+    params = ([0.1, 1.0, 10.0], ["HRIR", "BRIR"])
+    param_names = ["seconds", "ir_type"]
+
+    def setup(self, seconds, ir_type):
+        self.audio = _noise(seconds)
+        su.render_source(self.audio[:SR // 10], SUBJECT, SR, ir_type, "none", AZIMUTH, ELEVATION)
+
+    def time_render_source(self, seconds, ir_type):
+        su.render_source(self.audio, SUBJECT, SR, ir_type, "none", AZIMUTH, ELEVATION)
+
+
+class RenderSourceMulti:
+    params = ([1.0], ["HRIR", "BRIR"], [1, 10, 100])
+    param_names = ["seconds", "ir_type", "n_directions"]
+
+    def setup(self, seconds, ir_type, n_directions):
+        self.audio = _noise(seconds)
+        # Off-grid 10 x 10 azimuth/elevation grid, as in transform_all.py
+        self.directions = [((AZIMUTH + 36 * (i % 10)) % 360, ELEVATION - 72 + 16 * (i // 10)) for i in range(n_directions)]
+        su.render_source_multi(self.audio, SUBJECT, SR, ir_type, "none", self.directions)
+
+    def time_render_source_multi(self, seconds, ir_type, n_directions):
+        su.render_source_multi(self.audio, SUBJECT, SR, ir_type, "none", self.directions)
+
+
+class MixTracksBinaural:
+    params = [1, 4, 16, 64]
+    param_names = ["n_tracks"]
+
+    def setup(self, n_tracks):
+        rng = np.random.default_rng(n_tracks)
+        self.tracks = [
+            su.TrackObject(
+                name=f"track_{i}",
+                azimuth=int(rng.integers(0, 360)),
+                elevation=int(rng.integers(-60, 61)),
+                level=0.5,
+                reverb=0.0,
+                audio=_noise(1.0, seed=i),
+            )
+            for i in range(n_tracks)
+        ]
+        su.mix_tracks_binaural(self.tracks[:1], SUBJECT, SR, "HRIR", "none")
+
+    def time_mix_tracks_binaural(self, n_tracks):
+        su.mix_tracks_binaural(self.tracks, SUBJECT, SR, "HRIR", "none")
+
+
+class RenderSurroundToBinaural:
+    params = ["5.1", "7.1.4", "9.1.4"]
+    param_names = ["layout"]
+
+    def setup(self, layout):
+        n_channels = len(compile_layout(layout))
+        self.container = np.stack([_noise(1.0, seed=i) for i in range(n_channels)])
+        su.compile_layout_bank(SUBJECT, SR, "HRIR", layout)
+
+    def time_render_surround_to_binaural(self, layout):
+        su.render_surround_to_binaural(self.container, SR, SUBJECT, "HRIR", layout, layout)
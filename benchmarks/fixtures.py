@@ -0,0 +1,195 @@
+"""
+Synthetic stand-ins for the SADIE II database and the CS2 clip corpus, so the
+benchmarks run offline without the real downloads.
+
+``make_synthetic_sadie`` writes a Database-Master_V1-4 tree with the same folder
+layout, file names, channel count, sample rates and IR lengths as SADIE II
+(256-tap HRIRs, 0.3 s BRIRs) on a regular angle grid plus every speaker layout
+angle. The IRs are decaying noise: the timings are what matters, not the sound.
+
+Fixtures are built once under BINAMIX_BENCH_DIR (default: <tmp>/binamix-bench)
+and reused while their parameters match.
+"""
+
+import os
+import json
+import tempfile
+import numpy as np
+import soundfile as sf
+import pandas as pd
+from typing import Iterable, List, Tuple
+
+FIXTURE_ROOT = os.environ.get("BINAMIX_BENCH_DIR") or os.path.join(
+    tempfile.gettempdir(), "binamix-bench"
+)
+
+_RATE_FOLDERS = {44100: ("44K_16bit", "PCM_16"), 48000: ("48K_24bit", "PCM_24"), 96000: ("96K_24bit", "PCM_24")}
+_STAMP_FILE = "fixture.json"
+
+
+def _is_current(root: str, params: dict) -> bool:
+    stamp = os.path.join(root, _STAMP_FILE)
+    if not os.path.exists(stamp):
+        return False
+    with open(stamp, "r", encoding="utf-8") as f:
+        return json.load(f) == params
+
+
+def _stamp(root: str, params: dict) -> None:
+    with open(os.path.join(root, _STAMP_FILE), "w", encoding="utf-8") as f:
+        json.dump(params, f)
+
+
+def sadie_angle_grid(grid_step: int = 15) -> List[Tuple[float, float]]:
+    """Regular (azimuth, elevation) grid plus the angles of every supported speaker layout."""
+    import binamix.surround_utilities as surround
+
+    angles = {(0.0, 90.0), (0.0, -90.0)}
+    for ele in range(-90 + grid_step, 90, grid_step):
+        for azi in range(0, 360, grid_step):
+            angles.add((float(azi), float(ele)))
+    for layout in surround.supported_layouts():
+        table = surround.compile_layout(layout)
+        angles.update(zip(table["azi"].tolist(), table["ele"].tolist()))
+    return sorted(angles)
+
+
+def _wav_name(azimuth: float, elevation: float) -> str:
+    # Same naming as sadie_utilities.construct_wav_filename
+    return f"azi_{azimuth:.1f}_ele_{elevation:.1f}".replace(".", ",") + ".wav"
+
+
+def make_synthetic_sadie(
+    root: str,
+    subjects: Iterable[str] = ("D1",),
+    ir_types: Iterable[str] = ("HRIR", "BRIR"),
+    sample_rate: int = 44100,
+    grid_step: int = 15,
+    hrir_taps: int = 256,
+    brir_seconds: float = 0.3,
+    seed: int = 0,
+) -> str:
+    """
+    Write a SADIE II shaped WAV tree under ``root`` and return its
+    Database-Master_V1-4 path (the value for BINAMIX_SADIE_PATH).
+    """
+    base = os.path.join(root, "Database-Master_V1-4")
+    params = {
+        "subjects": list(subjects),
+        "ir_types": list(ir_types),
+        "sample_rate": sample_rate,
+        "grid_step": grid_step,
+        "hrir_taps": hrir_taps,
+        "brir_seconds": brir_seconds,
+        "seed": seed,
+    }
+    if _is_current(root, params):
+        return base
+
+    folder, subtype = _RATE_FOLDERS[sample_rate]
+    angles = sadie_angle_grid(grid_step)
+    rng = np.random.default_rng(seed)
+    for subject in params["subjects"]:
+        for ir_type in params["ir_types"]:
+            taps = hrir_taps if ir_type == "HRIR" else int(brir_seconds * sample_rate)
+            directory = os.path.join(base, subject, f"{subject}_{ir_type}_WAV", folder)
+            os.makedirs(directory, exist_ok=True)
+            decay = np.exp(-np.arange(taps) / (taps / 8))[:, None]
+            for azimuth, elevation in angles:
+                ir = 0.25 * rng.standard_normal((taps, 2)) * decay
+                sf.write(os.path.join(directory, _wav_name(azimuth, elevation)), ir, sample_rate, subtype=subtype)
+
+    os.makedirs(root, exist_ok=True)
+    _stamp(root, params)
+    print(f"Synthetic SADIE fixture: {len(angles)} angles per subject/type in {base}")
+    return base
+
+
+def ensure_sadie_fixture(**kwargs) -> str:
+    """
+    Point BINAMIX_SADIE_PATH at a SADIE tree, building the synthetic one if the
+    variable is not set already. Must run before binamix.sadie_utilities is imported.
+    """
+    path = os.environ.get("BINAMIX_SADIE_PATH")
+    if not path:
+        path = make_synthetic_sadie(os.path.join(FIXTURE_ROOT, "sadie"), **kwargs)
+        os.environ["BINAMIX_SADIE_PATH"] = path
+    return path
+
+
+def make_synthetic_corpus(
+    root: str,
+    clips_per_class: int = 8,
+    clip_seconds: float = 1.0,
+    ambient_files: int = 2,
+    ambient_seconds: float = 20.0,
+    sample_rate: int = 48000,
+    precompile: bool = True,
+    seed: int = 0,
+) -> str:
+    """
+    Write the clip folders, class CSVs and ambient files augment.py expects
+    (relative to ``root``), optionally compile the clip corpus, and return ``root``.
+    Run augment from inside ``root``.
+    """
+    params = {
+        "clips_per_class": clips_per_class,
+        "clip_seconds": clip_seconds,
+        "ambient_files": ambient_files,
+        "ambient_seconds": ambient_seconds,
+        "sample_rate": sample_rate,
+        "precompile": precompile,
+        "seed": seed,
+    }
+    if _is_current(root, params):
+        return root
+
+    ensure_sadie_fixture()
+    import augment
+    from corpus import compile_corpus
+
+    rng = np.random.default_rng(seed)
+
+    def write_noise(path: str, seconds: float) -> None:
+        n = int(seconds * sample_rate)
+        envelope = np.exp(-np.linspace(0, 6, n))
+        sf.write(path, 0.3 * rng.standard_normal(n) * envelope, sample_rate)
+
+    for class_key, (directory, csv_path) in augment.CLASS_CSV_MAP.items():
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+        os.makedirs(os.path.join(root, os.path.dirname(csv_path)), exist_ok=True)
+        names = [f"{class_key}_{i}.wav" for i in range(clips_per_class)]
+        for name in names:
+            write_noise(os.path.join(root, directory, name), clip_seconds)
+        pd.DataFrame({"name": names, "class": class_key}).to_csv(
+            os.path.join(root, csv_path), index=False
+        )
+
+    os.makedirs(os.path.join(root, augment.AMBIENT_DIR), exist_ok=True)
+    names = [f"ambient_{i}.wav" for i in range(ambient_files)]
+    for name in names:
+        write_noise(os.path.join(root, augment.AMBIENT_DIR, name), ambient_seconds)
+    pd.DataFrame({"name": names, "class": "ambient"}).to_csv(
+        os.path.join(root, augment.AMBIENT_CSV), index=False
+    )
+
+    if precompile:
+        cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            ambient = [os.path.join(augment.AMBIENT_DIR, n) for n in names]
+            compile_corpus(augment.CORPUS_DIR, augment.CLASS_CSV_MAP, ambient, sr=augment.SR)
+        finally:
+            os.chdir(cwd)
+
+    _stamp(root, params)
+    return root
+
+
+def ensure_corpus_fixture(**kwargs) -> str:
+    return make_synthetic_corpus(os.path.join(FIXTURE_ROOT, "corpus"), **kwargs)
+
+
+if __name__ == "__main__":
+    print(ensure_sadie_fixture())
+    print(ensure_corpus_fixture())
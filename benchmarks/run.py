@@ -0,0 +1,143 @@
+"""
+Minimal runner for the asv-style benchmarks in this folder, for machines
+without asv:
+
+    python -m benchmarks.run                         # everything
+    python -m benchmarks.run -k MixTracks --repeat 5
+    python -m benchmarks.run --json base.json        # save results
+    python -m benchmarks.run --compare base.json     # exit 1 on regressions
+
+``time_*`` methods report the best of ``--repeat`` runs (after one warm-up
+call), ``track_*`` methods report their return value. With ``--compare`` a
+timing that got slower, or a tracked rate (higher is better) that dropped, by
+more than ``--threshold`` counts as a regression.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import inspect
+import argparse
+import importlib
+import itertools
+import statistics
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _bench_modules() -> List[str]:
+    return sorted(
+        f"benchmarks.{f[:-3]}"
+        for f in os.listdir(BENCH_DIR)
+        if f.startswith("bench_") and f.endswith(".py")
+    )
+
+
+def _param_grid(cls) -> List[tuple]:
+    params = getattr(cls, "params", None)
+    if params is None:
+        return [()]
+    if isinstance(params, tuple):
+        return list(itertools.product(*params))
+    return [(p,) for p in params]
+
+
+def _call_quietly(fn, *args, verbose=False):
+    if verbose:
+        return fn(*args)
+    with redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def run_benchmarks(pattern: str = "", repeat: int = 3, verbose: bool = False) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    for module_name in _bench_modules():
+        module = importlib.import_module(module_name)
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            methods = [m for m in dir(cls) if m.startswith(("time_", "track_"))]
+            for params in _param_grid(cls):
+                for method in methods:
+                    key = f"{cls_name}.{method}({', '.join(map(str, params))})"
+                    if pattern not in key:
+                        continue
+                    bench = cls()
+                    try:
+                        if hasattr(bench, "setup"):
+                            _call_quietly(bench.setup, *params, verbose=verbose)
+                        fn = getattr(bench, method)
+                        if method.startswith("time_"):
+                            _call_quietly(fn, *params, verbose=verbose)  # warm-up
+                            times = []
+                            for _ in range(repeat):
+                                t0 = time.perf_counter()
+                                _call_quietly(fn, *params, verbose=verbose)
+                                times.append(time.perf_counter() - t0)
+                            result = {"kind": "time", "value": min(times), "median": statistics.median(times), "unit": "s"}
+                        else:
+                            value = _call_quietly(fn, *params, verbose=verbose)
+                            result = {"kind": "track", "value": float(value), "unit": getattr(fn, "unit", "")}
+                    except Exception as e:
+                        result = {"kind": "error", "error": f"{type(e).__name__}: {e}"}
+                    finally:
+                        if hasattr(bench, "teardown"):
+                            _call_quietly(bench.teardown, *params, verbose=verbose)
+                    results[key] = result
+                    print(_format(key, result), flush=True)
+    return results
+
+
+def _format(key: str, result: Dict) -> str:
+    if result["kind"] == "error":
+        return f"{key:<75} ERROR {result['error']}"
+    if result["kind"] == "time":
+        return f"{key:<75} {result['value'] * 1000:10.2f} ms  (median {result['median'] * 1000:.2f} ms)"
+    return f"{key:<75} {result['value']:10.2f} {result['unit']}"
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Keys that regressed by more than ``threshold`` (a ratio) against ``baseline``."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base or base["kind"] != result["kind"] or result["kind"] == "error":
+            continue
+        if result["kind"] == "time":
+            ratio = result["value"] / base["value"]
+        else:
+            ratio = base["value"] / result["value"] if result["value"] else float("inf")
+        if ratio > threshold:
+            regressions.append(f"{key}: {ratio:.2f}x worse")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the binamix benchmarks.")
+    parser.add_argument("-k", dest="pattern", default="", help="Only run benchmarks whose name contains this.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark. Default: 3")
+    parser.add_argument("--json", help="Write results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Regression ratio. Default: 1.25")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the benchmarked code.")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.pattern, args.repeat, args.verbose)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failed = [k for k, r in results.items() if r["kind"] == "error"]
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+
+    sys.exit(1 if failed or regressions else 0)
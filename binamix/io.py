@@ -0,0 +1,176 @@
+import os
+import json
+import hashlib
+import numpy as np
+import soundfile as sf
+import soxr
+
+# Decoded (and resampled) audio is cached here as .npz files, keyed by a hash of the
+# source path, size, mtime and the load parameters. Set BINAMIX_AUDIO_CACHE to move it,
+# or to "0" / "off" to turn the cache off.
+AUDIO_CACHE_ENV = "BINAMIX_AUDIO_CACHE"
+DEFAULT_AUDIO_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "binamix", "audio")
+
+# The cache is capped at BINAMIX_AUDIO_CACHE_MAX_MB (default 2 GB). Hits refresh an entry's
+# mtime and once the cap is passed the least recently used entries are deleted, down to
+# AUDIO_CACHE_LOW_WATER of it. Each process re-measures the folder every AUDIO_CACHE_RESCAN_EVERY
+# writes, so other processes' writes are accounted for too.
+AUDIO_CACHE_MAX_MB_ENV = "BINAMIX_AUDIO_CACHE_MAX_MB"
+DEFAULT_AUDIO_CACHE_MAX_MB = 2048
+AUDIO_CACHE_LOW_WATER = 0.9
+AUDIO_CACHE_RESCAN_EVERY = 256
+
+# cache folder -> [estimated bytes, writes since the last scan], per process
+_cache_usage = {}
+
+# Formats that read straight from disk as fast as a cached .npz, so they are only cached when resampled
+UNCOMPRESSED_FORMATS = ("WAV", "WAVEX", "AIFF", "W64", "RF64", "RAW", "CAF")
+
+# Same resampler as librosa.load's default res_type
+RESAMPLE_QUALITY = "soxr_hq"
+
+
+# Function to get the audio cache folder, None if caching is turned off
+def get_audio_cache_dir(cache_dir=None):
+    cache_dir = cache_dir or os.environ.get(AUDIO_CACHE_ENV) or DEFAULT_AUDIO_CACHE
+    if cache_dir.lower() in ("0", "off", "false", "none"):
+        return None
+    return cache_dir
+
+
+# Function to get the audio cache size cap in bytes
+def get_audio_cache_max_bytes():
+    return int(float(os.environ.get(AUDIO_CACHE_MAX_MB_ENV, DEFAULT_AUDIO_CACHE_MAX_MB)) * 1024 * 1024)
+
+
+# Function to list the cache entries as (mtime, size, path), least recently used first
+def scan_audio_cache(cache_dir):
+    entries = []
+    for dirpath, _dirnames, filenames in os.walk(cache_dir):
+        for name in filenames:
+            if not name.endswith(".npz") or ".tmp" in name:
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+    return sorted(entries)
+
+
+# Function to delete least recently used cache entries until the cache holds at most max_bytes.
+# Returns the size of the cache afterwards.
+def evict_audio_cache(cache_dir, max_bytes=None):
+    max_bytes = get_audio_cache_max_bytes() if max_bytes is None else max_bytes
+    entries = scan_audio_cache(cache_dir)
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Another process evicted it already
+            pass
+        total -= size
+    return total
+
+
+# Function to account for a new cache entry and evict old ones once the cache is over its cap
+def note_audio_cache_write(cache_dir, nbytes):
+    max_bytes = get_audio_cache_max_bytes()
+    usage = _cache_usage.get(cache_dir)
+    if usage is None or usage[1] >= AUDIO_CACHE_RESCAN_EVERY:
+        usage = [sum(size for _, size, _ in scan_audio_cache(cache_dir)), 0]
+        _cache_usage[cache_dir] = usage
+    else:
+        usage[0] += nbytes
+    usage[1] += 1
+    if usage[0] > max_bytes:
+        usage[0] = evict_audio_cache(cache_dir, int(max_bytes * AUDIO_CACHE_LOW_WATER))
+        usage[1] = 0
+
+
+# Function to build the cache key of a load: the file's identity (path, size, mtime) and the load parameters
+def audio_cache_key(path, sr, mono, offset, duration):
+    st = os.stat(path)
+    key = {
+        "path": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sr": sr,
+        "mono": bool(mono),
+        "offset": float(offset),
+        "duration": None if duration is None else float(duration),
+        "quality": RESAMPLE_QUALITY,
+    }
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# Function to resample audio of shape (..., samples) with soxr, trimmed or padded to ceil(samples * ratio) like librosa
+def resample_audio(audio, orig_sr, target_sr):
+    if orig_sr == target_sr:
+        return audio
+    n_out = int(np.ceil(audio.shape[-1] * float(target_sr) / orig_sr))
+    # soxr takes (frames, channels)
+    resampled = soxr.resample(audio.T, orig_sr, target_sr, quality=RESAMPLE_QUALITY).T
+    if resampled.shape[-1] < n_out:
+        resampled = np.pad(resampled, [(0, 0)] * (resampled.ndim - 1) + [(0, n_out - resampled.shape[-1])])
+    return np.ascontiguousarray(resampled[..., :n_out], dtype=np.float32)
+
+
+# Function to decode part or all of an audio file with soundfile. Returns (audio, file sample rate, format).
+# audio is float32 with shape (samples,) for mono files or when mono=True, otherwise (channels, samples).
+def decode_audio(path, mono=True, offset=0.0, duration=None):
+    with sf.SoundFile(path) as f:
+        file_sr = f.samplerate
+        if offset:
+            f.seek(int(offset * file_sr))
+        frames = int(duration * file_sr) if duration is not None else -1
+        audio = f.read(frames, dtype="float32", always_2d=True).T
+        file_format = f.format
+
+    if mono or audio.shape[0] == 1:
+        audio = audio.mean(axis=0) if audio.shape[0] > 1 else audio[0]
+    return np.ascontiguousarray(audio, dtype=np.float32), file_sr, file_format
+
+
+# Function to load an audio file as float32 at a given sample rate (None keeps the file's rate), like librosa.load.
+# offset and duration are in seconds. Returns (audio, sr); audio has shape (samples,) when mono, else (channels, samples).
+# Decodes are cached on disk (see get_audio_cache_dir), so a file is only decoded and resampled once per parameters
+# while its entry stays in the size-capped cache (see get_audio_cache_max_bytes).
+def load_audio(path, sr=None, mono=True, offset=0.0, duration=None, cache=True, cache_dir=None):
+
+    cache_dir = get_audio_cache_dir(cache_dir) if cache else None
+    cache_path = None
+    if cache_dir is not None:
+        key = audio_cache_key(path, sr, mono, offset, duration)
+        cache_path = os.path.join(cache_dir, key[:2], key + ".npz")
+        try:
+            with np.load(cache_path) as cached:
+                audio, cached_sr = cached["audio"], int(cached["sr"])
+            try:
+                # Mark the entry as recently used for eviction
+                os.utime(cache_path)
+            except OSError:
+                pass
+            return audio, cached_sr
+        except (OSError, ValueError, KeyError):
+            # Missing or unreadable cache entry: decode again
+            pass
+    elif not os.path.exists(path):
+        raise FileNotFoundError(path)
+
+    audio, file_sr, file_format = decode_audio(path, mono=mono, offset=offset, duration=duration)
+    out_sr = file_sr if sr is None else sr
+    audio = resample_audio(audio, file_sr, out_sr)
+
+    if cache_path is not None and (out_sr != file_sr or file_format not in UNCOMPRESSED_FORMATS):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, audio=audio, sr=out_sr)
+        os.replace(tmp_path, cache_path)
+        note_audio_cache_write(cache_dir, os.path.getsize(cache_path))
+
+    return audio, out_sr
@@ -1,10 +1,16 @@
-# This script will transcode an input file to opus format at 32, 64, 128, 256, and 512 kbps 
+# This script will transcode an input file to opus format at 32, 64, 128, 256, and 512 kbps
 # and then decode them back to wav format. This can be used to test the effect of different bitrates on binaural audio quality.
 
+import io
 import soundfile as sf
+import numpy as np
 import subprocess
+import threading
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
+from binamix.io import resample_audio
 
 # IMPORTANT: Add the path to the Opus Tools folder here. It should contain the binaries 'opusenc' and 'opusdec'.
 
@@ -14,57 +20,243 @@ opus_path = './opus-tools-0.1.9-macos/'
 # Path for Windows
 # opus_path = './opus-tools-0.2-win/'
 
+# Bitrates (kbps) generate_transcodes produces by default
+BITRATES = [32, 64, 128, 256, 512]
+
+# Opus codec backends: "tools" runs the opusenc/opusdec binaries above, "soundfile" encodes and decodes
+# in process through libsndfile's ogg/opus support (no binaries needed). "auto" uses the binaries if
+# they actually run on this machine (the bundled ones are macOS/Windows builds) and soundfile otherwise.
+OPUS_BACKENDS = ("auto", "tools", "soundfile")
+
+# libsndfile only encodes opus at 8/12/16/24/48 kHz, so the soundfile backend always codes at 48 kHz
+OPUS_SAMPLE_RATE = 48000
+
+# libsndfile garbles the last few ms of an opus stream, so one 20 ms frame of silence is appended before encoding
+OPUS_TAIL_PADDING = 960
+
+
+# Function to build the output slug for an input file: '<output_path><name>' or '<input without .wav>', without '_REF'
+def get_output_slug(input, output_path=None):
 
-# Takes path to wav file as input and generates transcodded files in the same folder unless output_path is specified.
-def generate_transcodes(input, output_path=None):
-    
     if output_path is None:
-        output_slug = input.replace(".wav", "") 
+        output_slug = input.replace(".wav", "")
     else:
         filename = os.path.basename(input)
         output_slug = f"{output_path}{filename.replace('.wav', '')}"
 
     # Renmove REF from the filename if exists
-    output_slug = output_slug.replace("_REF", "") 
+    return output_slug.replace("_REF", "")
+
+
+# Function to run an opus-tools command, raising RuntimeError with its error output if it fails
+def run_opus_tool(command):
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        message = result.stderr.decode(errors="replace").strip()
+        raise RuntimeError(f"{os.path.basename(command[0])} exited with {result.returncode}: {message}")
+
+
+# Function to encode one file to opus at one bitrate and decode it back to '<output_slug>_opus<bitrate>k.wav'.
+# The intermediate .opus file is removed. Returns the path of the decoded wav.
+def transcode_opus(input, output_slug, bitrate):
+
+    opus_file = f"{output_slug}_{bitrate}k.opus"
+    wav_file = f"{output_slug}_opus{bitrate}k.wav"
+    try:
+        run_opus_tool([f"{opus_path}opusenc", "--bitrate", str(bitrate), input, opus_file])
+        run_opus_tool([f"{opus_path}opusdec", "--force-wav", opus_file, wav_file])
+    finally:
+        if os.path.exists(opus_file):
+            os.remove(opus_file)
+    return wav_file
+
+
+# Function to check whether the installed libsndfile can encode ogg/opus
+def soundfile_supports_opus():
+    return "OPUS" in sf.available_subtypes("OGG")
+
+
+# Function to check once per opus_path whether opusenc and opusdec there are executable and run (--version)
+@lru_cache(maxsize=None)
+def probe_opus_tools(path):
+    for tool in ("opusenc", "opusdec"):
+        binary = f"{path}{tool}"
+        if not os.access(binary, os.X_OK):
+            return False
+        try:
+            result = subprocess.run([binary, "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            # e.g. "Exec format error" for the bundled macOS binaries on Linux
+            return False
+        if result.returncode != 0:
+            return False
+    return True
+
+
+# Function to check whether the opus-tools binaries in opus_path can be used on this machine
+def opus_tools_available():
+    return probe_opus_tools(opus_path)
+
+
+# Function to pick the backend to use for backend="auto" and check the name, see OPUS_BACKENDS
+def resolve_opus_backend(backend="auto"):
+    if backend not in OPUS_BACKENDS:
+        raise ValueError(f"Unknown opus backend '{backend}', expected one of {OPUS_BACKENDS}")
+    if backend == "auto":
+        backend = "tools" if opus_tools_available() or not soundfile_supports_opus() else "soundfile"
+    return backend
+
+
+# Function to map a bitrate (kbps over all channels, like opusenc --bitrate) to a libsndfile compression_level.
+# libsndfile spreads compression_level 0.0 -> 1.0 linearly over 256 -> 6 kbps per channel.
+def opus_compression_level(bitrate, channels):
+    per_channel = bitrate * 1000.0 / channels
+    return float(np.clip((256000.0 - per_channel) / 250000.0, 0.0, 1.0))
+
+
+# Function to trim or zero pad decoded audio of shape (samples, channels) to n samples
+def match_length(audio, n):
+    if len(audio) < n:
+        audio = np.concatenate([audio, np.zeros((n - len(audio), audio.shape[1]), dtype=audio.dtype)])
+    return audio[:n]
+
+
+# Function to encode audio to opus and decode it back, returning the degraded audio.
+# audio is float (-1 to 1) or int16 with shape (samples,) or (samples, channels). Returns float32 audio of the same shape.
+# backend is one of OPUS_BACKENDS; both backends work entirely in memory.
+def opus_round_trip(audio, sample_rate, bitrate, backend="auto"):
+    if resolve_opus_backend(backend) == "soundfile":
+        return opus_round_trip_soundfile(audio, sample_rate, bitrate)
+    return opus_round_trip_tools(audio, sample_rate, bitrate)
 
-    if not os.path.exists(opus_path):
+
+# Function to encode audio to opus and decode it back in process with soundfile (libsndfile + libopus).
+# The audio is resampled to 48 kHz for the codec and back to sample_rate afterwards.
+def opus_round_trip_soundfile(audio, sample_rate, bitrate):
+
+    audio = np.asarray(audio)
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768.0
+    samples = audio.reshape(len(audio), -1).astype(np.float32, copy=False)
+    channels = samples.shape[1]
+
+    # resample_audio works on (channels, samples)
+    coded = resample_audio(samples.T, sample_rate, OPUS_SAMPLE_RATE).T
+    coded = np.concatenate([coded, np.zeros((OPUS_TAIL_PADDING, channels), dtype=np.float32)])
+
+    buffer = io.BytesIO()
+    sf.write(buffer, coded, OPUS_SAMPLE_RATE, format="OGG", subtype="OPUS",
+             compression_level=opus_compression_level(bitrate, channels))
+    buffer.seek(0)
+    decoded, _ = sf.read(buffer, dtype="float32", always_2d=True)
+
+    output = match_length(resample_audio(decoded.T, OPUS_SAMPLE_RATE, sample_rate).T, len(samples))
+    return output[:, 0] if audio.ndim == 1 else output
+
+
+# Function to encode audio to opus and decode it back entirely through pipes (opusenc | opusdec), with no files on disk.
+# Takes and returns audio like opus_round_trip.
+def opus_round_trip_tools(audio, sample_rate, bitrate):
+
+    audio = np.asarray(audio)
+    channels = 1 if audio.ndim == 1 else audio.shape[1]
+    if audio.dtype == np.int16:
+        pcm = audio
+    else:
+        pcm = np.clip(np.round(audio * 32768.0), -32768, 32767).astype(np.int16)
+
+    # Raw 16-bit PCM in on stdin, ogg/opus out on stdout, straight into opusdec, raw 16-bit PCM out
+    encode = [f"{opus_path}opusenc", "--quiet", "--bitrate", str(bitrate), "--raw", "--raw-bits", "16",
+              "--raw-rate", str(sample_rate), "--raw-chan", str(channels), "-", "-"]
+    decode = [f"{opus_path}opusdec", "--quiet", "--rate", str(sample_rate), "-", "-"]
+
+    encoder = subprocess.Popen(encode, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    decoder = subprocess.Popen(decode, stdin=encoder.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # Only opusdec reads the encoded stream, so opusenc sees a broken pipe if opusdec dies
+    encoder.stdout.close()
+
+    # Feed opusenc on a thread while reading opusdec, so neither side blocks on a full pipe
+    def feed():
+        try:
+            encoder.stdin.write(pcm.astype("<i2", copy=False).tobytes())
+        except BrokenPipeError:
+            pass
+        finally:
+            encoder.stdin.close()
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    # opusenc's stderr is drained on its own thread so a chatty encoder can't stall the pipeline
+    encoder_errors = []
+    drainer = threading.Thread(target=lambda: encoder_errors.append(encoder.stderr.read()), daemon=True)
+    drainer.start()
+
+    decoded, decoder_errors = decoder.communicate()
+    feeder.join()
+    drainer.join()
+    encoder.wait()
+
+    for name, process, errors in (("opusenc", encoder, encoder_errors[0] if encoder_errors else b""), ("opusdec", decoder, decoder_errors)):
+        if process.returncode != 0:
+            raise RuntimeError(f"{name} exited with {process.returncode}: {errors.decode(errors='replace').strip()}")
+
+    output = np.frombuffer(decoded, dtype="<i2").astype(np.float32) / 32768.0
+    output = output[: len(output) // channels * channels].reshape(-1, channels)
+
+    # opusdec drops the encoder delay, so the length should match already; pad/trim to be exact
+    output = match_length(output, len(pcm))
+    return output[:, 0] if audio.ndim == 1 else output
+
+
+# Function to transcode one file in memory (see opus_round_trip) and write the decoded wav once: '<output_slug>_opus<bitrate>k.wav'
+def transcode_opus_in_memory(input, output_slug, bitrate, backend="tools"):
+    audio, sample_rate = sf.read(input, dtype="int16" if backend == "tools" else "float32")
+    wav_file = f"{output_slug}_opus{bitrate}k.wav"
+    sf.write(wav_file, opus_round_trip(audio, sample_rate, bitrate, backend), sample_rate, subtype="PCM_16")
+    return wav_file
+
+
+# Takes path to wav file (or a list of paths) as input and generates transcodded files in the same folder unless output_path is specified.
+# Every (file, bitrate) encode->decode chain is one job; jobs run concurrently on max_workers threads (default: CPU count).
+# progress(done, total, result) is called as each job finishes. Returns one result per job, in input/bitrate order:
+# {"input", "bitrate", "output", "error"} where error is None on success and the failure message otherwise.
+# With pipe=True the audio is streamed through opusenc | opusdec (see opus_round_trip_tools) and no .opus files are written.
+# backend is one of OPUS_BACKENDS; the "soundfile" backend codes in process and needs no opus-tools binaries.
+def generate_transcodes(input, output_path=None, bitrates=BITRATES, max_workers=None, progress=None, pipe=False, backend="auto"):
+
+    inputs = [input] if isinstance(input, (str, os.PathLike)) else list(input)
+
+    backend = resolve_opus_backend(backend)
+    if backend == "tools" and not os.path.exists(opus_path):
         print(f"Error: The folder '{opus_path}' was not found.", file=sys.stderr)
         sys.exit(1)
 
-    # Transcode to target bitrates
-    transcode_to_32k = [f"{opus_path}opusenc", "--bitrate", "32", input, f"{output_slug}_32k.opus"]
-    transcode_to_64k = [f"{opus_path}opusenc", "--bitrate", "64", input, f"{output_slug}_64k.opus"]
-    transcode_to_128k = [f"{opus_path}opusenc", "--bitrate", "128", input, f"{output_slug}_128k.opus"]
-    transcode_to_256k = [f"{opus_path}opusenc", "--bitrate", "256", input, f"{output_slug}_256k.opus"]
-    transcode_to_512k = [f"{opus_path}opusenc", "--bitrate", "512", input, f"{output_slug}_512k.opus"]
-
-    # Run the commands
-    subprocess.run(transcode_to_32k, stdout=subprocess.DEVNULL)
-    subprocess.run(transcode_to_64k, stdout=subprocess.DEVNULL)
-    subprocess.run(transcode_to_128k, stdout=subprocess.DEVNULL)
-    subprocess.run(transcode_to_256k, stdout=subprocess.DEVNULL)
-    subprocess.run(transcode_to_512k, stdout=subprocess.DEVNULL)
-
-    # Decode targets back to wav
-    decode_32k = [f"{opus_path}opusdec", "--force-wav", f"{output_slug}_32k.opus", f"{output_slug}_opus32k.wav"]
-    decode_64k = [f"{opus_path}opusdec", "--force-wav", f"{output_slug}_64k.opus", f"{output_slug}_opus64k.wav"]
-    decode_128k = [f"{opus_path}opusdec", "--force-wav", f"{output_slug}_128k.opus", f"{output_slug}_opus128k.wav"]
-    decode_256k = [f"{opus_path}opusdec", "--force-wav", f"{output_slug}_256k.opus", f"{output_slug}_opus256k.wav"]
-    decode_512k = [f"{opus_path}opusdec", "--force-wav", f"{output_slug}_512k.opus", f"{output_slug}_opus512k.wav"]
-
-    # Run the commands
-    subprocess.run(decode_32k, stdout=subprocess.DEVNULL)
-    subprocess.run(decode_64k, stdout=subprocess.DEVNULL)
-    subprocess.run(decode_128k, stdout=subprocess.DEVNULL)
-    subprocess.run(decode_256k, stdout=subprocess.DEVNULL)
-    subprocess.run(decode_512k, stdout=subprocess.DEVNULL)
-
-    # Delete the opus files
-    os.remove(f"{output_slug}_32k.opus")
-    os.remove(f"{output_slug}_64k.opus")
-    os.remove(f"{output_slug}_128k.opus")
-    os.remove(f"{output_slug}_256k.opus")
-    os.remove(f"{output_slug}_512k.opus")
-    
+    jobs = [(path, bitrate) for path in inputs for bitrate in bitrates]
+    results = [None] * len(jobs)
+    if not jobs:
+        return results
 
+    if backend == "tools" and not pipe:
+        transcode = transcode_opus
+    else:
+        transcode = partial(transcode_opus_in_memory, backend=backend)
+    max_workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = {
+            pool.submit(transcode, path, get_output_slug(path, output_path), bitrate): i
+            for i, (path, bitrate) in enumerate(jobs)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            path, bitrate = jobs[i]
+            result = {"input": path, "bitrate": bitrate, "output": None, "error": None}
+            try:
+                result["output"] = future.result()
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+                print(f"Error: opus {bitrate}k transcode of '{path}' failed: {result['error']}", file=sys.stderr)
+            results[i] = result
+            if progress is not None:
+                progress(done, len(jobs), result)
 
+    return results
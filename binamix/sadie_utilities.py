@@ -1,13 +1,16 @@
 
-import librosa
 import os
 import numpy as np
+from functools import lru_cache
+from binamix.io import load_audio
 import binamix.surround_utilities as surround
 from scipy.spatial import Delaunay
+from scipy.fft import rfft, irfft, next_fast_len
 import matplotlib.pyplot as plot
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
-sadie_base_path = os.path.join(script_dir, "..", "sadie", "Database-Master_V1-4")
+# BINAMIX_SADIE_PATH points at another copy of the Database-Master_V1-4 tree (e.g. the synthetic benchmark fixture)
+sadie_base_path = os.environ.get("BINAMIX_SADIE_PATH") or os.path.join(script_dir, "..", "sadie", "Database-Master_V1-4")
 reverb_base_path = os.path.join(script_dir, "..", "reverb_IRs")
 
 if not os.path.exists(sadie_base_path):
@@ -121,7 +124,7 @@ def load_sadie_ir(subject_id, sample_rate, ir_type, azimuth, elevation):
 
     try:
         # Load the WAV file using the correct file path and filename
-        y, sr = librosa.load(filename, sr=None, mono=False)
+        y, sr = load_audio(filename, sr=None, mono=False, cache=False)
     except FileNotFoundError:
         raise FileNotFoundError(f"Try using ir_type: 'HRIR' instead because the subject_id: '{subject_id}', ir_type: '{ir_type}' does not have the necessary IR angles for the speaker_layout chosen")
     except Exception as e:
@@ -143,6 +146,45 @@ def extract_azimuth_elevation(filename):
 
     return azimuth, elevation
 
+# Function to list every measured angle for a given subject, sample rate and IR type.
+# The directory is only scanned once per combination and its listing order defines the IR bank row index.
+# The order is kept as listed because the Delaunay triangulation of the regular SADIE grid depends on it.
+@lru_cache(maxsize=None)
+def list_sadie_angles(subject_id, sample_rate, ir_type):
+    wav_file_path = select_sadie_wav_subject(subject_id, sample_rate, ir_type)
+    wav_files = [file for file in os.listdir(wav_file_path) if file.endswith('.wav')]
+    return tuple(extract_azimuth_elevation(file) for file in wav_files)
+
+# Function to map each measured angle to its IR bank row index
+@lru_cache(maxsize=None)
+def get_ir_bank_index(subject_id, sample_rate, ir_type):
+    return {angle: row for row, angle in enumerate(list_sadie_angles(subject_id, sample_rate, ir_type))}
+
+# Record layout of a speaker layout compiled against a subject/IR type: the surround table plus the IR bank row of each channel
+LAYOUT_BANK_DTYPE = np.dtype(surround.LAYOUT_DTYPE.descr + [('ir_index', np.int64)])
+
+# Function to compile a speaker layout against the IRs available for a subject, sample rate and IR type.
+# Raises straight away if the layout needs an angle the subject/IR type does not have, rather than
+# failing in load_sadie_ir partway through a render.
+@lru_cache(maxsize=None)
+def compile_layout_bank(subject_id, sample_rate, ir_type, speaker_layout):
+    layout = surround.compile_layout(speaker_layout)
+    bank_index = get_ir_bank_index(subject_id, sample_rate, ir_type)
+
+    table = np.zeros(len(layout), dtype=LAYOUT_BANK_DTYPE)
+    for field in surround.LAYOUT_DTYPE.names:
+        table[field] = layout[field]
+    table['ir_index'] = [bank_index.get((azi, ele), -1) for azi, ele in zip(layout['azi'], layout['ele'])]
+
+    # Lfe is folded into the centre channel so it is never looked up on its own
+    missing = table[(table['ir_index'] < 0) & (table['name'] != 'Lfe')]
+    if len(missing):
+        missing_angles = [(float(channel['azi']), float(channel['ele'])) for channel in missing]
+        raise FileNotFoundError(f"Try using ir_type: 'HRIR' instead because the subject_id: '{subject_id}', ir_type: '{ir_type}' does not have the necessary IR angles for the speaker_layout chosen (missing {missing_angles})")
+
+    table.flags.writeable = False
+    return table
+
 # Function to return all available angles for a given subject and IR type
 def get_available_angles(subject_id, sample_rate, ir_type, speaker_layout):
     # Get all available angles for a given subject and IR type
@@ -156,43 +198,44 @@ def get_available_angles(subject_id, sample_rate, ir_type, speaker_layout):
     if subject_id not in ['D1', 'D2'] + [f'H{i}' for i in range(3, 21)]:
         raise ValueError(f"Invalid subject ID: {subject_id} - Valid IDs are D1, D2, and H3 to H20")
 
-    # Select the correct file path based on the subject ID, sample rate and type
-    wav_file_path = select_sadie_wav_subject(subject_id, sample_rate, ir_type)
-
-    # Get a list of all the WAV files in the directory
-    wav_files = [file for file in os.listdir(wav_file_path) if file.endswith('.wav')]
-
-    # Extract the azimuth and elevation from each filename
-    angles = [extract_azimuth_elevation(file) for file in wav_files]
-
     # Filter the angles based on the speaker layout and return the filtered list
     if speaker_layout in surround.supported_layouts():
-        channels = surround.get_channel_angles(speaker_layout)
+        channels = compile_layout_bank(subject_id, sample_rate, ir_type, speaker_layout)
 
         # remove the Lfe channel as it is not relevant for binaural rendering other than direct binarual renders of channel encoded surround
-        channels = [channel for channel in channels if channel.name != 'Lfe']
+        channels = channels[channels['name'] != 'Lfe']
 
-        angles = [(channel.azi, channel.ele) for channel in channels]
+        return [(float(azi), float(ele)) for azi, ele in zip(channels['azi'], channels['ele'])]
 
-    elif speaker_layout == "none":
-        angles = angles
-    else:
+    if speaker_layout != "none":
         print(f"Invalid speaker layout: '{speaker_layout}' - Using all available angles")
 
-    return angles
+    return list(list_sadie_angles(subject_id, sample_rate, ir_type))
+
+# Function to return the available angles together with their cartesian points (as computed by spherical_to_cartesian), cached per subject and layout
+@lru_cache(maxsize=None)
+def get_available_angle_points(subject_id, sample_rate, ir_type, speaker_layout):
+    available_angles = tuple(get_available_angles(subject_id, sample_rate, ir_type, speaker_layout))
+    points = np.array([spherical_to_cartesian(angle[0], angle[1]) for angle in available_angles])
+    points.flags.writeable = False
+    return available_angles, points
 
 # Function to return the nearest available angle to a given azimuth and elevation
 def get_nearest_angle(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation):
     # Get the nearest available angle to a given azimuth and elevation
 
     # Get all available angles for the specified subject and IR type
-    available_angles = get_available_angles(subject_id, sample_rate, ir_type, speaker_layout)
+    available_angles, points = get_available_angle_points(subject_id, sample_rate, ir_type, speaker_layout)
 
     # Calculate the difference between the specified azimuth and elevation and each available angle using cartesian coordinates
-    differences = [get_angle_distance(azimuth, elevation, angle[0], angle[1]) for angle in available_angles]
+    distances = np.sqrt(np.sum((points - spherical_to_cartesian(azimuth, elevation)) ** 2, axis=1))
+
+    # Re-check the (near) ties with get_angle_distance so the first nearest angle wins exactly as in a linear scan
+    candidates = np.flatnonzero(distances <= distances.min() + 1e-9)
+    differences = [get_angle_distance(azimuth, elevation, available_angles[i][0], available_angles[i][1]) for i in candidates]
 
     # Find the index of the angle with the smallest difference
-    nearest_index = differences.index(min(differences))
+    nearest_index = candidates[differences.index(min(differences))]
 
     # Return the nearest angle
     return available_angles[nearest_index]
@@ -276,14 +319,7 @@ def has_elevation_speakers(speaker_layout):
     if speaker_layout == "none":
         return True
 
-    angles = surround.get_channel_angles(speaker_layout)
-
-    elevations = [angle.ele for angle in angles]
-
-    if any(elevation != 0 for elevation in elevations):
-        return True
-    else:
-        return False
+    return surround.layout_has_elevation(speaker_layout)
 
 # Function to get azimuth neighbours on nearest plane
 def get_planar_neighbours(available_angles, azimuth, elevation, verbose=True):
@@ -356,6 +392,19 @@ def get_elevation_range(available_angles):
 # Function to generate an interpolated HRIR/BRIR for a given subject, sample rate, IR type, speaker layout, azimuth and elevation
 def generate_sadie_ir(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation, mode="auto", verbose=True):
 
+    # Work out which measured IRs to blend and by how much, then load and sum them
+    angles, weights = resolve_sadie_ir_weights(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation, mode=mode, verbose=verbose)
+
+    ir = load_sadie_ir(subject_id, sample_rate, ir_type, angles[0][0], angles[0][1]) * weights[0]
+    for angle, weight in zip(angles[1:], weights[1:]):
+        ir = ir + load_sadie_ir(subject_id, sample_rate, ir_type, angle[0], angle[1]) * weight
+
+    return ir
+
+# Function to resolve the measured angles and weights that generate_sadie_ir blends for a given azimuth and elevation.
+# Returns (angles, weights): a list of 1 to 3 (azimuth, elevation) tuples available for the subject and a matching list of weights.
+def resolve_sadie_ir_weights(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation, mode="auto", verbose=True):
+
     if mode not in ["auto", "nearest", "planar", "two_point", "three_point"]:
         raise ValueError(f"Invalid mode: {mode} - Valid modes are 'auto', 'nearest', 'planar', 'two_point', 'three_point'")
 
@@ -391,8 +440,7 @@ def generate_sadie_ir(subject_id, sample_rate, ir_type, speaker_layout, azimuth,
         # Use the nearest angle
         print(f"Desired Angle: ({azimuth}, {elevation})")
         print(f"Using Nearest Angle: ({nearest_angle[0]}, {nearest_angle[1]})")
-        ir = load_sadie_ir(subject_id, sample_rate, ir_type, nearest_angle[0], nearest_angle[1])
-        return ir
+        return [nearest_angle], [1.0]
 
     if mode == "planar":
         # Use the nearest angle on the same elevation plane
@@ -410,12 +458,12 @@ def generate_sadie_ir(subject_id, sample_rate, ir_type, speaker_layout, azimuth,
     if angle_exists(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation):
         # If the desired angle exists, load the HRIR/BRIR data for that angle
         print("Using Actual Angle to achieve angle: az", azimuth, "ele", elevation)
-        ir = load_sadie_ir(subject_id, sample_rate, ir_type, azimuth, elevation)
+        angles, weights = [(azimuth, elevation)], [1.0]
 
     elif get_angle_distance(azimuth, elevation, nearest_angle[0], nearest_angle[1]) < distance_threshold:
         # If the desired angle does not exist, but is within the distance threshold, use the nearest angle
         print("Using Nearest Angle", nearest_angle, "to achieve angle: az", azimuth, "ele", elevation)
-        ir = load_sadie_ir(subject_id, sample_rate, ir_type, nearest_angle[0], nearest_angle[1])
+        angles, weights = [nearest_angle], [1.0]
 
     else:
         # If angle does not exist and there is no close proxy,
@@ -556,37 +604,30 @@ def generate_sadie_ir(subject_id, sample_rate, ir_type, speaker_layout, azimuth,
                 print("Using 2 Point Interpolation to achieve cartesian angle estimate: ({:.2f}, {:.2f})".format(interp_with_two[0], interp_with_two[1]))
                 print("Angles used:", best_angle1, best_angle2)
 
-                angle1_ir = load_sadie_ir(subject_id, sample_rate, ir_type, best_angle1[0], best_angle1[1])
-                angle2_ir = load_sadie_ir(subject_id, sample_rate, ir_type, best_angle2[0], best_angle2[1])
-
-                ir = angle1_ir * w1_2p + angle2_ir * w2_2p
+                angles, weights = [best_angle1, best_angle2], [w1_2p, w2_2p]
 
             else:
                 # If 2 point interpolation is not better, use the nearest angle
                 print("Using Nearest Angle to achieve angle: ({:.2f}, {:.2f})".format(nearest_angle[0], nearest_angle[1]))
-                ir = load_sadie_ir(subject_id, sample_rate, ir_type, nearest_angle[0], nearest_angle[1])
+                angles, weights = [nearest_angle], [1.0]
 
         elif (angle_diff_3_point_interp < angle_diff_2_point_interp) or use_3_point_interp:
             # If 3 point interpolation is better, or it is the user specified interpolation use 3 point
             print("Using 3 Point Interpolation to achieve cartesian angle estimate: ({:.2f}, {:.2f})".format(interp_with_three[0], interp_with_three[1]))
             print(angle1, angle2, angle3)
 
-            angle1_ir = load_sadie_ir(subject_id, sample_rate, ir_type, angle1[0], angle1[1])
-            angle2_ir = load_sadie_ir(subject_id, sample_rate, ir_type, angle2[0], angle2[1])
-            angle3_ir = load_sadie_ir(subject_id, sample_rate, ir_type, angle3[0], angle3[1])
-
-            ir = angle1_ir * w1_3p + angle2_ir * w2_3p + angle3_ir * w3_3p
+            angles, weights = [angle1, angle2, angle3], [w1_3p, w2_3p, w3_3p]
 
         else:
             # If none of the conditions are met, use the nearest angle
             print("Something went wrong: ussing nearest angle to achieve angle: ({:.2f}, {:.2f})".format(nearest_angle[0], nearest_angle[1]))
-            ir = load_sadie_ir(subject_id, sample_rate, ir_type, nearest_angle[0], nearest_angle[1])
+            angles, weights = [nearest_angle], [1.0]
 
 
     print("-----------------------------------")
 
 
-    return ir
+    return angles, weights
 
 
 
@@ -711,6 +752,141 @@ def render_source(input_file, subject_id, sample_rate, ir_type, speaker_layout,
 
     return output
 
+# Function to load every IR of a subject, sample rate and IR type into one read-only array of shape (n_angles, 2, taps).
+# Row order matches list_sadie_angles / get_ir_bank_index.
+@lru_cache(maxsize=None)
+def load_sadie_ir_bank(subject_id, sample_rate, ir_type):
+    angles = list_sadie_angles(subject_id, sample_rate, ir_type)
+    bank = np.stack([load_sadie_ir(subject_id, sample_rate, ir_type, angle[0], angle[1]) for angle in angles])
+    bank.flags.writeable = False
+    return bank
+
+# Function to resolve an azimuth and elevation into IR bank rows and weights (same blend as generate_sadie_ir)
+def resolve_sadie_ir_rows(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation, mode="auto"):
+    angles, weights = resolve_sadie_ir_weights(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation, mode=mode, verbose=False)
+    bank_index = get_ir_bank_index(subject_id, sample_rate, ir_type)
+    rows = [bank_index[(angle[0], angle[1])] for angle in angles]
+    return rows, weights
+
+# Function to build blended IRs for many sources in one indexed read of the IR bank.
+# rows and weights have shape (..., J); unused slots should carry a weight of 0. Returns shape (..., 2, taps).
+def gather_sadie_irs(subject_id, sample_rate, ir_type, rows, weights):
+    bank = load_sadie_ir_bank(subject_id, sample_rate, ir_type)
+    irs = bank[np.asarray(rows)]
+    return np.einsum('...j,...jct->...ct', np.asarray(weights, dtype=bank.dtype), irs)
+
+# Function to render and mix a batch of scenes with one batched FFT convolution.
+# audio has shape (B, K, N) (B scenes of K sources), irs (B, K, 2, taps) and levels (B, K).
+# Returns the binaural mixes with shape (B, 2, N + taps - 1), matching mix_tracks_binaural without reverb.
+def convolve_binaural_batch(audio, irs, levels):
+    n_out = audio.shape[-1] + irs.shape[-1] - 1
+    n_fft = next_fast_len(n_out, real=True)
+
+    audio_spectra = rfft(audio, n_fft, axis=-1)
+    ir_spectra = rfft(irs, n_fft, axis=-1)
+
+    # Sum over sources in the frequency domain, then one inverse FFT per scene and ear
+    mix_spectra = np.einsum('bkf,bkcf,bk->bcf', audio_spectra, ir_spectra, np.asarray(levels, dtype=audio_spectra.real.dtype))
+    return irfft(mix_spectra, n_fft, axis=-1)[..., :n_out]
+
+# Function to pick the FFT size for partitioned (overlap-add) convolution of n_samples with IRs of ir_taps taps.
+# Blocks are at least twice the IR length (4096 minimum) and never longer than one FFT over the whole signal.
+def multi_render_fft_size(n_samples, ir_taps):
+    return next_fast_len(min(n_samples + ir_taps - 1, max(2 * ir_taps, 4096)), real=True)
+
+# Function to get the spectrum of the blended IR for one direction (same blend as generate_sadie_ir), shape (2, n_fft // 2 + 1).
+# Spectra are cached and shared between callers, so they are read-only.
+@lru_cache(maxsize=1024)
+def get_sadie_ir_spectrum(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation, mode, n_fft):
+    rows, weights = resolve_sadie_ir_rows(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation, mode=mode)
+    ir = gather_sadie_irs(subject_id, sample_rate, ir_type, rows, weights)
+    spectrum = rfft(ir, n_fft, axis=-1)
+    spectrum.flags.writeable = False
+    return spectrum
+
+# Function to render one source at many directions, yielding (index, output) for each direction in order.
+# The source is FFT'd once (in overlap-add blocks) and multiplied by the cached IR spectrum of every direction,
+# so each extra direction costs one spectral product and one inverse FFT. directions is a sequence of (azimuth, elevation).
+# Each output has shape (2, N + taps - 1) like render_source. max_block_bytes bounds the working set of one chunk of directions.
+def iter_render_source_multi(input_file, subject_id, sample_rate, ir_type, speaker_layout, directions, mode="auto", max_block_bytes=256 * 1024 * 1024):
+
+    audio = np.asarray(input_file)
+    n_samples = len(audio)
+    ir_taps = load_sadie_ir_bank(subject_id, sample_rate, ir_type).shape[-1]
+    n_out = n_samples + ir_taps - 1
+
+    n_fft = multi_render_fft_size(n_samples, ir_taps)
+    block = n_fft - ir_taps + 1
+    n_blocks = -(-n_samples // block)
+
+    # The one forward FFT pass over the source, shape (blocks, bins)
+    padded = np.zeros(n_blocks * block, dtype=audio.dtype)
+    padded[:n_samples] = audio
+    source_spectra = rfft(padded.reshape(n_blocks, block), n_fft, axis=-1)
+
+    # Directions per chunk, so the (directions, 2, blocks, bins) product stays within max_block_bytes
+    bytes_per_direction = 2 * source_spectra.size * source_spectra.itemsize
+    chunk = max(1, int(max_block_bytes // bytes_per_direction))
+
+    directions = list(directions)
+    for start in range(0, len(directions), chunk):
+        chunk_directions = directions[start:start + chunk]
+        ir_spectra = np.stack([
+            get_sadie_ir_spectrum(subject_id, sample_rate, ir_type, speaker_layout, azimuth, elevation, mode, n_fft)
+            for azimuth, elevation in chunk_directions
+        ])
+
+        blocks_out = irfft(ir_spectra[:, :, None, :] * source_spectra[None, None, :, :], n_fft, axis=-1)
+
+        # Overlap-add: each block gives `block` samples plus an IR tail that lands on the next block
+        # (with more than one block the FFT is at least 2 IRs long, so a tail never spans two blocks)
+        n_dirs = len(chunk_directions)
+        if n_blocks == 1:
+            output = blocks_out[:, :, 0, :]
+        else:
+            output = np.zeros((n_dirs, 2, (n_blocks + 1) * block), dtype=blocks_out.dtype)
+            output[:, :, :n_blocks * block] += blocks_out[..., :block].reshape(n_dirs, 2, -1)
+            tails = np.zeros((n_dirs, 2, n_blocks, block), dtype=blocks_out.dtype)
+            tails[..., :ir_taps - 1] = blocks_out[..., block:block + ir_taps - 1]
+            output[:, :, block:] += tails.reshape(n_dirs, 2, -1)
+
+        for i in range(n_dirs):
+            yield start + i, output[i, :, :n_out]
+
+# Function to render one source at many directions in one pass (see iter_render_source_multi).
+# Returns shape (n_directions, 2, N + taps - 1); pass out (e.g. an np.memmap) to fill an existing array instead.
+def render_source_multi(input_file, subject_id, sample_rate, ir_type, speaker_layout, directions, mode="auto", out=None):
+
+    directions = list(directions)
+    if out is None:
+        ir_taps = load_sadie_ir_bank(subject_id, sample_rate, ir_type).shape[-1]
+        dtype = np.result_type(np.asarray(input_file).dtype, np.float32)
+        out = np.empty((len(directions), 2, len(input_file) + ir_taps - 1), dtype=dtype)
+
+    for i, output in iter_render_source_multi(input_file, subject_id, sample_rate, ir_type, speaker_layout, directions, mode=mode):
+        out[i] = output
+
+    return out
+
+# Function to load the reverb IR for a reverb type ('1' to '4') at a given sample rate. Cached and read-only.
+@lru_cache(maxsize=None)
+def load_reverb_ir(reverb_type, sample_rate):
+    reverb_files = {'1': "lecture_theatre.wav", '2': "office.wav", '3': "small_room.wav", '4': "meeting_room.wav"}
+    if reverb_type not in reverb_files:
+        raise ValueError("Invalid reverb type. Choose from 1, 2, 3, or 4")
+
+    reverb_ir, sr = load_audio(os.path.join(reverb_base_path, reverb_files[reverb_type]), sr=sample_rate, mono=True)
+    reverb_ir.flags.writeable = False
+    return reverb_ir
+
+# Function to add reverb to a mono source the same way mix_tracks_binaural does (reverb amount 0 to 1).
+# The output is padded to len(audio) + len(reverb_ir) - 1 samples.
+def add_reverb(audio, reverb, reverb_ir):
+    dry = np.pad(audio, (0, len(reverb_ir) - 1), 'constant')
+    if reverb == 0:
+        return dry
+    return (np.convolve(audio, reverb_ir) * reverb) + (dry * (1 - reverb))
+
 # Function to pan a source using amplitude panning
 def pan_source(pan, input_file):
     # Pan a source using amplitude panning
@@ -752,17 +928,12 @@ def mix_tracks_binaural(tracks, subject_id, sample_rate, ir_type, speaker_layout
         if track.azimuth is None or track.elevation is None:
             raise ValueError("All tracks must have azimuth and elevation specified")
 
-    # load reverb IR
-    if reverb_type == '1':
-        reverb_ir, sr = librosa.load(os.path.join(reverb_base_path, "lecture_theatre.wav"), sr=sample_rate, mono=True)
-    elif reverb_type == '2':
-        reverb_ir, sr = librosa.load(os.path.join(reverb_base_path, "office.wav"), sr=sample_rate, mono=True)
-    elif reverb_type == '3':
-        reverb_ir, sr = librosa.load(os.path.join(reverb_base_path, "small_room.wav"), sr=sample_rate, mono=True)
-    elif reverb_type == '4':
-        reverb_ir, sr = librosa.load(os.path.join(reverb_base_path, "meeting_room.wav"), sr=sample_rate, mono=True)
-    else:
-        raise ValueError("Invalid reverb type. Choose from 1, 2, 3, or 4")
+    # Check the speaker layout can be rendered with this subject and IR type before doing any work
+    if speaker_layout in surround.supported_layouts():
+        compile_layout_bank(subject_id, sample_rate, ir_type, speaker_layout)
+
+    # load reverb IR (cached after the first call)
+    reverb_ir = load_reverb_ir(reverb_type, sample_rate)
 
 
 
@@ -825,17 +996,8 @@ def mix_tracks_stereo(tracks, sample_rate, reverb_type='1'):
 
     print("Rendering Mix...")
 
-     # load reverb IR
-    if reverb_type == '1':
-        reverb_ir, sr = librosa.load(os.path.join(reverb_base_path, "lecture_theatre.wav"), sr=sample_rate, mono=True)
-    elif reverb_type == '2':
-        reverb_ir, sr = librosa.load(os.path.join(reverb_base_path, "office.wav"), sr=sample_rate, mono=True)
-    elif reverb_type == '3':
-        reverb_ir, sr = librosa.load(os.path.join(reverb_base_path, "small_room.wav"), sr=sample_rate, mono=True)
-    elif reverb_type == '4':
-        reverb_ir, sr = librosa.load(os.path.join(reverb_base_path, "meeting_room.wav"), sr=sample_rate, mono=True)
-    else:
-        raise ValueError("Invalid reverb type. Choose from 1, 2, 3, or 4")
+     # load reverb IR (cached after the first call)
+    reverb_ir = load_reverb_ir(reverb_type, sample_rate)
 
 
     ir_length = len(reverb_ir)-1
@@ -3,6 +3,8 @@
 # The channel order and naming conventions come from the SMPTE ST 2067-8 standard and https://developer.dolby.com/globalassets/technology/atmos/additional-channels-for-immersive-audio.pdf
 # Closest angles available are chosen from the SADIE II dataset for each channel.
 
+import numpy as np
+
 # -----------------------------------------------------
 class SurroundChannelPosition:
     def __init__(self, name, azi, ele):
@@ -13,194 +15,106 @@ class SurroundChannelPosition:
     def __repr__(self):
         return f"Name={self.name}, Azimuth={self.azi}°, Elevation={self.ele}°"
 
+# -----------------------------------------------------
+# Channel definitions for each supported layout as (name, azimuth, elevation)
+
+# Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
+# E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
+
+_BED_7_1 = (
+    ('L', 30, 0),           # Front Left
+    ('R', 330, 0),          # Front Right
+    ('C', 0, 0),            # Center
+    ('Lfe', 0, 0),          # Low Frequency - Mapped to Center for Binaural Rendering
+    ('Lss', 90, 0),         # Surround Side Left
+    ('Rss', 270, 0),        # Surround Side Right
+    ('Lrs', 135, 0),        # Surround Rear Left
+    ('Rrs', 225, 0),        # Surround Rear Right
+)
+
+_BED_5_1 = (
+    ('L', 30, 0),           # Front Left
+    ('R', 330, 0),          # Front Right
+    ('C', 0, 0),            # Center
+    ('Lfe', 0, 0),          # Low Frequency - Mapped to Center for Binaural Rendering
+    ('Lrs', 120, 0),        # Surround Left
+    ('Rrs', 240, 0),        # Surround Right
+)
+
+_WIDES = (
+    ('Lw', 60, 0),          # Wide Left
+    ('Rw', 300, 0),         # Wide Right
+)
+
+_TOP_FRONT = (
+    ('Ltf', 45, 35.3),      # Top Front Left
+    ('Rtf', 315, 35.3),     # Top Front Right
+)
+
+_TOP_BACK = (
+    ('Ltb', 135, 35.3),     # Top Rear Left
+    ('Rtb', 225, 35.3),     # Top Rear Right
+)
+
+_LAYOUT_CHANNELS = {
+    '7.1': _BED_7_1,
+    '7.1.4': _BED_7_1 + _TOP_FRONT + _TOP_BACK,
+    '7.1.2': _BED_7_1 + _TOP_FRONT,
+    '5.1': _BED_5_1,
+    '5.1.4': _BED_5_1 + _TOP_FRONT + _TOP_BACK,
+    '5.1.2': _BED_5_1 + _TOP_FRONT,
+    '9.1.4': _BED_7_1 + _WIDES + _TOP_FRONT + _TOP_BACK,
+    '9.1.2': _BED_7_1 + _WIDES + _TOP_FRONT,
+    '9.1': _BED_7_1 + _WIDES,
+}
+
+# Record layout of a compiled speaker layout table. The unit vector uses the same
+# convention as sadie_utilities.spherical_to_cartesian (x front, y left, z up).
+LAYOUT_DTYPE = np.dtype([
+    ('name', 'U8'),
+    ('azi', np.float64),
+    ('ele', np.float64),
+    ('unit', np.float64, (3,)),
+])
+
+_compiled_layouts = {}
+
 def supported_layouts():
     return ['7.1', '7.1.4', '7.1.2', '5.1', '5.1.4', '5.1.2', '9.1.4', '9.1.2', '9.1']
 
 def get_channel_angles(layout):
 
-    if layout == '7.1':
-
-        # Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
-        # E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
-    
-        L = SurroundChannelPosition('L', 30, 0)       # Front Left 
-        R = SurroundChannelPosition('R', 330, 0)      # Front Right 
-        C = SurroundChannelPosition('C', 0, 0)        # Center
-        Lfe = SurroundChannelPosition('Lfe', 0, 0)    # Low Frequency - Mapped to Center for Binaural Rendering
-        Lss = SurroundChannelPosition('Lss', 90, 0)   # Side Surround Left
-        Rss = SurroundChannelPosition('Rss', 270, 0)  # Side Surround Right
-        Lrs = SurroundChannelPosition('Lrs', 135, 0)  # Surround Rear Left
-        Rrs = SurroundChannelPosition('Rrs', 225, 0)  # Surround Rear Right
-
-        channels = [L, R, C, Lfe, Lss, Rss, Lrs, Rrs]
-    
-        return channels
-    
-    elif layout == '7.1.4':
-
-        # Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
-        # E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
-     
-        L = SurroundChannelPosition('L', 30, 0)         # Front Left 
-        R = SurroundChannelPosition('R', 330, 0)        # Front Right  
-        C = SurroundChannelPosition('C', 0, 0)          # Center
-        Lfe = SurroundChannelPosition('Lfe', 0, 0)      # Low Frequency - Mapped to Center for Binaural Rendering
-        Lss = SurroundChannelPosition('Lss', 90, 0)     # Surround Side Left
-        Rss = SurroundChannelPosition('Rss', 270, 0)    # Surround Side Right
-        Lrs = SurroundChannelPosition('Lrs', 135, 0)    # Surround Rear Left
-        Rrs = SurroundChannelPosition('Rrs', 225, 0)    # Surround Rear Right
-        Ltf = SurroundChannelPosition('Ltf', 45, 35.3)  # Top Front Left
-        Rtf = SurroundChannelPosition('Rtf', 315, 35.3) # Top Front Right
-        Ltb = SurroundChannelPosition('Ltb', 135, 35.3) # Top Rear Left
-        Rtb = SurroundChannelPosition('Rtb', 225, 35.3) # Top Rear Right
-
-        channels = [L, R, C, Lfe, Lss, Rss, Lrs, Rrs, Ltf, Rtf, Ltb, Rtb]
-    
-        return channels
-    
-    elif layout == '7.1.2':
-
-        # Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
-        # E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
-     
-        L = SurroundChannelPosition('L', 30, 0)         # Front Left 
-        R = SurroundChannelPosition('R', 330, 0)        # Front Right  
-        C = SurroundChannelPosition('C', 0, 0)          # Center
-        Lfe = SurroundChannelPosition('Lfe', 0, 0)      # Low Frequency - Mapped to Center for Binaural Rendering
-        Lss = SurroundChannelPosition('Lss', 90, 0)     # Surround Side Left
-        Rss = SurroundChannelPosition('Rss', 270, 0)    # Surround Side Right
-        Lrs = SurroundChannelPosition('Lrs', 135, 0)    # Surround Rear Left
-        Rrs = SurroundChannelPosition('Rrs', 225, 0)    # Surround Rear Right
-        Ltf = SurroundChannelPosition('Ltf', 45, 35.3)  # Top Front Left
-        Rtf = SurroundChannelPosition('Rtf', 315, 35.3) # Top Front Right
-       
-
-        channels = [L, R, C, Lfe, Lss, Rss, Lrs, Rrs, Ltf, Rtf]
-    
-        return channels
-
-    elif layout == '5.1':
-
-        # Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
-        # E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
-
-        L = SurroundChannelPosition('L', 30, 0)         # Front Left  
-        R = SurroundChannelPosition('R', 330, 0)        # Front Right 
-        C = SurroundChannelPosition('C', 0, 0)          # Center
-        Lfe = SurroundChannelPosition('Lfe', 0, 0)      # Low Frequency - Mapped to Center for Binaural Rendering
-        Lrs = SurroundChannelPosition('Lrs', 120, 0)    # Surround Left 
-        Rrs = SurroundChannelPosition('Rrs', 240, 0)    # Surround Right 
-
-        channels = [L, R, C, Lfe, Lrs, Rrs]
-
-        return channels
-
-    elif layout == '5.1.4':
-
-        # Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
-        # E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
- 
-        L = SurroundChannelPosition('L', 30, 0)         # Front Left 
-        R = SurroundChannelPosition('R', 330, 0)        # Front Right 
-        C = SurroundChannelPosition('C', 0, 0)          # Center
-        Lfe = SurroundChannelPosition('Lfe', 0, 0)      # Low Frequency - Mapped to Center for Binaural Rendering
-        Lrs = SurroundChannelPosition('Lrs', 120, 0)    # Surround Left 
-        Rrs = SurroundChannelPosition('Rrs', 240, 0)    # Surround Right 
-        Ltf = SurroundChannelPosition('Ltf', 45, 35.3)  # Top Front Left
-        Rtf = SurroundChannelPosition('Rtf', 315, 35.3) # Top Front Right
-        Ltb = SurroundChannelPosition('Ltb', 135, 35.3) # Top Rear Left
-        Rtb = SurroundChannelPosition('Rtb', 225, 35.3) # Top Rear Right
-
-        channels = [L, R, C, Lfe, Lrs, Rrs, Ltf, Rtf, Ltb, Rtb]
-
-        return channels
-    
-    elif layout == '5.1.2':
-
-        # Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
-        # E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
- 
-        L = SurroundChannelPosition('L', 30, 0)         # Front Left 
-        R = SurroundChannelPosition('R', 330, 0)        # Front Right 
-        C = SurroundChannelPosition('C', 0, 0)          # Center
-        Lfe = SurroundChannelPosition('Lfe', 0, 0)      # Low Frequency - Mapped to Center for Binaural Rendering
-        Lrs = SurroundChannelPosition('Lrs', 120, 0)    # Surround Left 
-        Rrs = SurroundChannelPosition('Rrs', 240, 0)    # Surround Right 
-        Ltf = SurroundChannelPosition('Ltf', 45, 35.3)  # Top Front Left
-        Rtf = SurroundChannelPosition('Rtf', 315, 35.3) # Top Front Right
-
-        channels = [L, R, C, Lfe, Lrs, Rrs, Ltf, Rtf]
-
-        return channels
-    
-    elif layout == '9.1.4':
-
-        # Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
-        # E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
-     
-        L = SurroundChannelPosition('L', 30, 0)         # Front Left 
-        R = SurroundChannelPosition('R', 330, 0)        # Front Right  
-        C = SurroundChannelPosition('C', 0, 0)          # Center
-        Lfe = SurroundChannelPosition('Lfe', 0, 0)      # Low Frequency - Mapped to Center for Binaural Rendering
-        Lss = SurroundChannelPosition('Lss', 90, 0)     # Surround Side Left
-        Rss = SurroundChannelPosition('Rss', 270, 0)    # Surround Side Right
-        Lrs = SurroundChannelPosition('Lrs', 135, 0)    # Surround Rear Left
-        Rrs = SurroundChannelPosition('Rrs', 225, 0)    # Surround Rear Right
-        Lw = SurroundChannelPosition('Lw', 60, 0)       # Wide Left
-        Rw = SurroundChannelPosition('Rw', 300, 0)      # Wide Right
-        Ltf = SurroundChannelPosition('Ltf', 45, 35.3)  # Top Front Left
-        Rtf = SurroundChannelPosition('Rtf', 315, 35.3) # Top Front Right
-        Ltb = SurroundChannelPosition('Ltb', 135, 35.3) # Top Rear Left
-        Rtb = SurroundChannelPosition('Rtb', 225, 35.3) # Top Rear Right
-
-        channels = [L, R, C, Lfe, Lss, Rss, Lrs, Rrs, Lw, Rw, Ltf, Rtf, Ltb, Rtb]
-    
-        return channels
-    
-    elif layout == '9.1.2':
-
-        # Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
-        # E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
-     
-        L = SurroundChannelPosition('L', 30, 0)         # Front Left 
-        R = SurroundChannelPosition('R', 330, 0)        # Front Right  
-        C = SurroundChannelPosition('C', 0, 0)          # Center
-        Lfe = SurroundChannelPosition('Lfe', 0, 0)      # Low Frequency - Mapped to Center for Binaural Rendering
-        Lss = SurroundChannelPosition('Lss', 90, 0)     # Surround Side Left
-        Rss = SurroundChannelPosition('Rss', 270, 0)    # Surround Side Right
-        Lrs = SurroundChannelPosition('Lrs', 135, 0)    # Surround Rear Left
-        Rrs = SurroundChannelPosition('Rrs', 225, 0)    # Surround Rear Right
-        Lw = SurroundChannelPosition('Lw', 60, 0)       # Wide Left
-        Rw = SurroundChannelPosition('Rw', 300, 0)      # Wide Right
-        Ltf = SurroundChannelPosition('Ltf', 45, 35.3)  # Top Front Left
-        Rtf = SurroundChannelPosition('Rtf', 315, 35.3) # Top Front Right
-
-        channels = [L, R, C, Lfe, Lss, Rss, Lrs, Rrs, Lw, Rw, Ltf, Rtf]
-    
-        return channels
-    
-    elif layout == '9.1':
-
-        # Note the SADIE II dataset does not have some standard surround angles across all subjects and BRIR/HRIR types
-        # E.g. Standard angles are 30° and 330° for L and R respectively and are contained in all HRIRs but not in the BRIRs
-     
-        L = SurroundChannelPosition('L', 30, 0)         # Front Left 
-        R = SurroundChannelPosition('R', 330, 0)        # Front Right  
-        C = SurroundChannelPosition('C', 0, 0)          # Center
-        Lfe = SurroundChannelPosition('Lfe', 0, 0)      # Low Frequency - Mapped to Center for Binaural Rendering
-        Lss = SurroundChannelPosition('Lss', 90, 0)     # Surround Side Left
-        Rss = SurroundChannelPosition('Rss', 270, 0)    # Surround Side Right
-        Lrs = SurroundChannelPosition('Lrs', 135, 0)    # Surround Rear Left
-        Rrs = SurroundChannelPosition('Rrs', 225, 0)    # Surround Rear Right
-        Lw = SurroundChannelPosition('Lw', 60, 0)       # Wide Left
-        Rw = SurroundChannelPosition('Rw', 300, 0)      # Wide Right
-
-        channels = [L, R, C, Lfe, Lss, Rss, Lrs, Rrs, Lw, Rw]
-    
-        return channels
-
-
-    else:
+    if layout not in _LAYOUT_CHANNELS:
+        raise ValueError(f"Unsupported layout: {layout} - Valid layouts are {supported_layouts()}")
+
+    return [SurroundChannelPosition(name, azi, ele) for name, azi, ele in _LAYOUT_CHANNELS[layout]]
+
+# Function to compile a speaker layout into a read-only NumPy structured array (see LAYOUT_DTYPE).
+# Tables are built once per layout and shared by every caller, so treat them as immutable.
+def compile_layout(layout):
 
+    table = _compiled_layouts.get(layout)
+    if table is not None:
+        return table
+
+    if layout not in _LAYOUT_CHANNELS:
         raise ValueError(f"Unsupported layout: {layout} - Valid layouts are {supported_layouts()}")
 
+    spec = _LAYOUT_CHANNELS[layout]
+    table = np.zeros(len(spec), dtype=LAYOUT_DTYPE)
+    table['name'] = [name for name, _, _ in spec]
+    table['azi'] = [azi for _, azi, _ in spec]
+    table['ele'] = [ele for _, _, ele in spec]
+
+    azi = np.radians(table['azi'])
+    ele = np.radians(table['ele'])
+    table['unit'] = np.stack([np.cos(azi) * np.cos(ele), np.sin(azi) * np.cos(ele), np.sin(ele)], axis=-1)
+
+    table.flags.writeable = False
+    _compiled_layouts[layout] = table
+
+    return table
+
+# Function to check if a speaker layout has any elevated channels
+def layout_has_elevation(layout):
+    return bool(np.any(compile_layout(layout)['ele'] != 0))
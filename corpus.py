@@ -0,0 +1,166 @@
+"""
+Pre-decoded clip corpus.
+
+``compile_corpus`` decodes every clip referenced by the class CSVs (and every
+ambient file) once to mono float32 at a fixed sample rate and concatenates them
+into a single raw float32 file next to an offset index:
+
+    <corpus_dir>/corpus.f32          all samples back to back
+    <corpus_dir>/corpus_index.csv    group, class, name, offset, length, orig_sr
+    <corpus_dir>/corpus.json         sample rate, dtype, total samples
+
+``ClipCorpus`` memory-maps the data file read-only, so a clip is just an array
+slice and every pool worker shares the same pages through the OS page cache.
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+import soundfile as sf
+import myRand
+from binamix.io import load_audio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DATA_FILE = "corpus.f32"
+INDEX_FILE = "corpus_index.csv"
+META_FILE = "corpus.json"
+
+
+def decode_clip(audio_path: str, sr: int) -> np.ndarray:
+    """Decode an audio file to a mono float32 array at ``sr``."""
+    audio, _ = load_audio(audio_path, sr=sr, mono=True)
+    return audio
+
+
+def _iter_sources(
+    class_csv_map: Dict[str, Tuple[str, str]], ambient_files: Iterable[str]
+) -> Iterable[Tuple[str, str, str, str]]:
+    """Yield (group, class, name, path) for every clip that should go into the corpus."""
+    for group, (directory, csv_path) in class_csv_map.items():
+        if not os.path.exists(csv_path):
+            print(f"Warning: Missing CSV for '{group}': {csv_path} (skipped)")
+            continue
+        df = pd.read_csv(csv_path)
+        for name, class_name in zip(df["name"], df["class"]):
+            yield group, class_name, name, os.path.join(directory, name)
+    for path in ambient_files:
+        yield "ambient", "ambient", os.path.basename(path), path
+
+
+def compile_corpus(
+    corpus_dir: str,
+    class_csv_map: Dict[str, Tuple[str, str]],
+    ambient_files: Iterable[str] = (),
+    sr: int = 44100,
+) -> pd.DataFrame:
+    """Decode every clip once and write the memory-mappable corpus to ``corpus_dir``.
+
+    Returns the written index. Clips that fail to decode are reported and skipped.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    data_path = os.path.join(corpus_dir, DATA_FILE)
+    tmp_path = data_path + ".tmp"
+
+    rows: List[Dict] = []
+    offset = 0
+    with open(tmp_path, "wb") as f:
+        for group, class_name, name, path in _iter_sources(class_csv_map, ambient_files):
+            try:
+                orig_sr = sf.info(path).samplerate
+                clip = decode_clip(path, sr)
+            except Exception as e:
+                print(f"Skipping {path}: {e}")
+                continue
+            f.write(clip.tobytes())
+            rows.append(
+                {
+                    "group": group,
+                    "class": class_name,
+                    "name": name,
+                    "offset": offset,
+                    "length": len(clip),
+                    "orig_sr": orig_sr,
+                }
+            )
+            offset += len(clip)
+    os.replace(tmp_path, data_path)
+
+    index = pd.DataFrame(
+        rows, columns=["group", "class", "name", "offset", "length", "orig_sr"]
+    )
+    index.to_csv(os.path.join(corpus_dir, INDEX_FILE), index=False)
+    with open(os.path.join(corpus_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"sr": sr, "dtype": "float32", "total_samples": offset}, f)
+
+    print(
+        f"Compiled {len(index)} clips ({offset / sr / 60:.1f} min, "
+        f"{offset * 4 / 1e6:.1f} MB) into {corpus_dir}"
+    )
+    return index
+
+
+class ClipCorpus:
+    """Read-only view of a compiled corpus. Clips are slices of one shared memmap."""
+
+    def __init__(self, corpus_dir: str):
+        with open(os.path.join(corpus_dir, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.sr = int(meta["sr"])
+        self.index = pd.read_csv(os.path.join(corpus_dir, INDEX_FILE))
+        if meta["total_samples"]:
+            self.audio = np.memmap(
+                os.path.join(corpus_dir, DATA_FILE), dtype=np.float32, mode="r"
+            )
+        else:
+            self.audio = np.zeros(0, dtype=np.float32)
+
+        self.offsets = self.index["offset"].to_numpy(dtype=np.int64)
+        self.lengths = self.index["length"].to_numpy(dtype=np.int64)
+        self.classes = self.index["class"].to_numpy(dtype=object)
+        groups = self.index["group"].to_numpy(dtype=object)
+        self._rows_by_group = {
+            group: np.flatnonzero(groups == group) for group in np.unique(groups)
+        }
+
+    @staticmethod
+    def exists(corpus_dir: str) -> bool:
+        return all(
+            os.path.exists(os.path.join(corpus_dir, f))
+            for f in (DATA_FILE, INDEX_FILE, META_FILE)
+        )
+
+    def has_group(self, group: str) -> bool:
+        return len(self._rows_by_group.get(group, ())) > 0
+
+    def clip(self, row: int) -> np.ndarray:
+        start = self.offsets[row]
+        return self.audio[start : start + self.lengths[row]]
+
+    def pick(
+        self, group: str, rng: Optional[np.random.Generator] = None
+    ) -> Tuple[np.ndarray, str]:
+        """Return (clip, class) for a uniformly chosen clip of ``group``."""
+        rows = self._rows_by_group[group]
+        row = rows[myRand.randint(0, len(rows), rng)]
+        return self.clip(row), self.classes[row]
+
+
+def open_corpus(corpus_dir: str) -> Optional[ClipCorpus]:
+    """Open ``corpus_dir`` if it has been compiled, else return None."""
+    if not ClipCorpus.exists(corpus_dir):
+        return None
+    return ClipCorpus(corpus_dir)
+
+
+if __name__ == "__main__":
+    from augment import CLASS_CSV_MAP, CORPUS_DIR, SR, list_ambient_files
+
+    parser = argparse.ArgumentParser(
+        description="Decode the augmentation clip corpus once into a memory-mappable file."
+    )
+    parser.add_argument("--out", default=CORPUS_DIR, help=f"Corpus directory. Default: {CORPUS_DIR}")
+    args = parser.parse_args()
+
+    compile_corpus(args.out, CLASS_CSV_MAP, list_ambient_files(), sr=SR)
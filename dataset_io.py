@@ -0,0 +1,458 @@
+"""
+Output backends for generated samples.
+
+- "wav": one ``sample_XXXX.wav`` per sample (the original layout).
+- "npy": samples are appended to sharded ``.npy`` containers. Every writer (one
+  per worker process) owns its own shard prefix, so no two processes ever touch
+  the same file. A shard holds up to ``shard_size`` samples as a float32 array of
+  shape (n, channels, frames) and is written atomically together with a JSON
+  sidecar that lists its sample ids and metadata rows. Readers can memory-map
+  whole shards with ``np.load(path, mmap_mode="r")``.
+
+Both writers accept an optional ``BackgroundWriter``. With one, the encoding and
+file I/O run on its thread while the caller goes on rendering; ``write`` still
+returns the sample's location columns straight away.
+"""
+
+import os
+import json
+import uuid
+import queue
+import threading
+import numpy as np
+import pandas as pd
+import soundfile as sf
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+OUTPUT_FORMATS = ("wav", "npy")
+SHARD_SIZE = 4096
+WRITE_QUEUE_SIZE = 64
+
+
+class BackgroundWriter:
+    """Runs write jobs in order on one thread behind a bounded queue.
+
+    ``submit`` blocks while ``max_pending`` jobs are waiting, so a producer that
+    outruns the disk is throttled instead of piling up audio in memory. A failing
+    job is reported and recorded in ``errors``; later jobs still run.
+    """
+
+    def __init__(self, max_pending: int = WRITE_QUEUE_SIZE, name: str = "background-writer"):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self.errors: List[Exception] = []
+        self._errors_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                fn, args = job
+                try:
+                    fn(*args)
+                except Exception as e:
+                    with self._errors_lock:
+                        self.errors.append(e)
+                    print(f"[{self._thread.name}] Write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, fn: Callable, *args) -> None:
+        if self._closed:
+            raise RuntimeError("BackgroundWriter is closed")
+        self._queue.put((fn, args))
+
+    def take_errors(self) -> List[Exception]:
+        """Return the errors recorded so far and clear them, so each is reported once."""
+        with self._errors_lock:
+            errors, self.errors = self.errors, []
+        return errors
+
+    def wait(self) -> None:
+        """Block until every submitted job has finished."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Finish the pending jobs and stop the thread. Safe to call twice."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+
+def _dispatch(background: Optional[BackgroundWriter], fn: Callable, *args) -> None:
+    if background is None:
+        fn(*args)
+    else:
+        background.submit(fn, *args)
+
+
+class WavSampleWriter:
+    """Writes each sample to its own WAV file (one file create per sample)."""
+
+    def __init__(self, output_dir: str, sr: int, background: Optional[BackgroundWriter] = None):
+        self.output_dir = output_dir
+        self.sr = sr
+        self.background = background
+
+    def write(self, sample_id: int, audio: np.ndarray, metadata: Dict) -> Dict:
+        """Write ``audio`` (channels, frames) and return its location columns."""
+        fname = f"sample_{sample_id:04d}.wav"
+        _dispatch(self.background, _save_wav, os.path.join(self.output_dir, fname), audio.T, self.sr)
+        return {"name_file": fname}
+
+    def close(self) -> None:
+        pass
+
+
+class NpyShardWriter:
+    """Appends samples to ``<prefix>-NNNNN.npy`` shards with JSON sidecars."""
+
+    def __init__(
+        self,
+        output_dir: str,
+        shard_size: int = SHARD_SIZE,
+        prefix: str = None,
+        background: Optional[BackgroundWriter] = None,
+    ):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.prefix = prefix or f"shard-{uuid.uuid4().hex[:8]}"
+        self.background = background
+        self._seq = 0
+        self._audio: List[np.ndarray] = []
+        self._rows: List[Dict] = []
+
+    @property
+    def shard_name(self) -> str:
+        return f"{self.prefix}-{self._seq:05d}.npy"
+
+    def write(self, sample_id: int, audio: np.ndarray, metadata: Dict) -> Dict:
+        """Queue ``audio`` (channels, frames) in the open shard and return its location columns."""
+        if self._audio and audio.shape != self._audio[0].shape:
+            raise ValueError(
+                f"Sample {sample_id} has shape {audio.shape}, shard holds {self._audio[0].shape}"
+            )
+        location = {"name_file": self.shard_name, "shard_offset": len(self._audio)}
+        self._audio.append(np.asarray(audio, dtype=np.float32))
+        self._rows.append({"sample_id": sample_id, **metadata, **location})
+        if len(self._audio) >= self.shard_size:
+            self.flush()
+        return location
+
+    def flush(self) -> None:
+        if not self._audio:
+            return
+        path = os.path.join(self.output_dir, self.shard_name)
+        sidecar = {"shard": self.shard_name, "samples": self._rows}
+        _dispatch(self.background, _save_shard, path, np.stack(self._audio), sidecar)
+        self._audio = []
+        self._rows = []
+        self._seq += 1
+
+    def close(self) -> None:
+        self.flush()
+
+
+def _save_wav(path: str, audio: np.ndarray, sr: int) -> None:
+    # Written under a temporary name, so a crash never leaves a truncated sample_XXXX.wav
+    tmp_path = path + ".tmp"
+    sf.write(tmp_path, audio, sr, format="WAV")
+    os.replace(tmp_path, path)
+
+
+def _save_shard(path: str, audio: np.ndarray, sidecar: Dict) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, audio)
+    with open(path[: -len(".npy")] + ".json", "w", encoding="utf-8") as f:
+        json.dump(sidecar, f)
+    os.replace(tmp_path, path)
+
+
+def make_writer(
+    output_format: str,
+    output_dir: str,
+    sr: int,
+    shard_size: int = SHARD_SIZE,
+    background: Optional[BackgroundWriter] = None,
+):
+    if output_format == "wav":
+        return WavSampleWriter(output_dir, sr, background=background)
+    if output_format == "npy":
+        return NpyShardWriter(output_dir, shard_size=shard_size, background=background)
+    raise ValueError(f"Unsupported output format: {output_format} - Valid formats are {OUTPUT_FORMATS}")
+
+
+# ---------------------------
+# Metadata
+# ---------------------------
+# Rows are dicts with typed values: ``classes`` is a list of class names and
+# ``x``/``y``/``z`` are lists of floats, one entry per source.
+#
+# - "parquet": ``dataset_metadata.parquet/`` holds ``part-NNNNN.parquet`` files,
+#   each written atomically, with list<string>/list<float32> columns. Every flush
+#   writes a part (so a crash loses at most the unflushed rows); every
+#   ``PARQUET_COMPACT_EVERY`` parts are merged into one and closing the writer
+#   merges them all, so a finished run leaves a single file.
+#   Read it with ``read_metadata`` or ``pd.read_parquet``.
+# - "csv": ``dataset_metadata.csv`` with the list columns comma-joined.
+METADATA_FORMATS = ("parquet", "csv")
+METADATA_CSV = "dataset_metadata.csv"
+METADATA_PARQUET = "dataset_metadata.parquet"
+LIST_COLUMNS = ("classes", "x", "y", "z")
+PARQUET_COMPACT_EVERY = 64
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "Parquet metadata needs pyarrow (pip install pyarrow), "
+            "or use metadata_format='csv'"
+        ) from e
+    return pa, pq
+
+
+def metadata_schema():
+    pa, _ = _require_pyarrow()
+    return pa.schema(
+        [
+            ("sample_id", pa.int64()),
+            ("name_file", pa.string()),
+            ("shard_offset", pa.int64()),
+            ("classes", pa.list_(pa.string())),
+            ("x", pa.list_(pa.float32())),
+            ("y", pa.list_(pa.float32())),
+            ("z", pa.list_(pa.float32())),
+            ("num_classes", pa.int32()),
+            ("codec_bitrate", pa.int32()),
+            ("shard", pa.int32()),
+            ("seed", pa.int64()),
+        ]
+    )
+
+
+def _join_list(value) -> str:
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return ",".join(str(v) for v in value)
+    return value
+
+
+def _split_list(value, cast) -> List:
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [cast(v) for v in value]
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value == "":
+        return []
+    return [cast(v) for v in str(value).split(",")]
+
+
+def _csv_frame(rows: List[Dict]) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(_join_list)
+    return df
+
+
+class CsvMetadataWriter:
+    """Appends rows to ``dataset_metadata.csv`` (list columns comma-joined)."""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, METADATA_CSV)
+
+    def append(self, rows: List[Dict]) -> None:
+        df = _csv_frame(rows)
+        write_header = not os.path.exists(self.path)
+        if not write_header:
+            # Keep the column order of the file being appended to
+            df = df.reindex(columns=pd.read_csv(self.path, nrows=0).columns)
+        df.to_csv(self.path, mode="a", header=write_header, index=False)
+
+    def close(self) -> None:
+        pass
+
+
+class ParquetMetadataWriter:
+    """
+    Appends rows to ``dataset_metadata.parquet/`` as one Parquet file per call.
+    The parts this writer added are merged every ``compact_every`` calls and
+    ``close`` merges every part in the directory into one file.
+    """
+
+    def __init__(self, output_dir: str, compact_every: int = PARQUET_COMPACT_EVERY):
+        _require_pyarrow()
+        self.directory = os.path.join(output_dir, METADATA_PARQUET)
+        os.makedirs(self.directory, exist_ok=True)
+        self.compact_every = compact_every
+        self._seq = _next_part_seq(self.directory)
+        self._recent: List[str] = []
+
+    def append(self, rows: List[Dict]) -> None:
+        pa, pq = _require_pyarrow()
+        # Missing values read back through pandas arrive as NaN
+        rows = [
+            {k: None if isinstance(v, float) and np.isnan(v) else v for k, v in row.items()}
+            for row in rows
+        ]
+        self._recent.append(self._write_part(pa.Table.from_pylist(rows, schema=metadata_schema())))
+        if len(self._recent) >= self.compact_every:
+            self.compact(self._recent)
+
+    def _write_part(self, table) -> str:
+        _, pq = _require_pyarrow()
+        path = os.path.join(self.directory, f"part-{self._seq:05d}.parquet")
+        tmp_path = path + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        self._seq += 1
+        return path
+
+    def compact(self, parts: Optional[List[str]] = None) -> None:
+        """
+        Merge ``parts`` (default: every part in the directory) into one new part.
+        The merged part is in place before the old ones are deleted, so a crash in
+        between leaves duplicate rows (which resume drops), never missing ones.
+        """
+        pa, pq = _require_pyarrow()
+        parts = list(parts) if parts is not None else _list_parquet_parts(self.directory)
+        if len(parts) > 1:
+            self._write_part(pa.concat_tables([pq.read_table(p) for p in parts]))
+            for path in parts:
+                os.remove(path)
+        self._recent = [p for p in self._recent if p not in parts]
+
+    def close(self) -> None:
+        self.compact()
+
+
+def _list_parquet_parts(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, f)
+        for f in os.listdir(directory)
+        if f.startswith("part-") and f.endswith(".parquet")
+    )
+
+
+def _next_part_seq(directory: str) -> int:
+    """Sequence number after the highest existing part, so a new part never overwrites one."""
+    parts = _list_parquet_parts(directory)
+    if not parts:
+        return 0
+    return int(os.path.basename(parts[-1])[len("part-") : -len(".parquet")]) + 1
+
+
+def make_metadata_writer(metadata_format: str, output_dir: str):
+    if metadata_format == "parquet":
+        return ParquetMetadataWriter(output_dir)
+    if metadata_format == "csv":
+        return CsvMetadataWriter(output_dir)
+    raise ValueError(
+        f"Unsupported metadata format: {metadata_format} - Valid formats are {METADATA_FORMATS}"
+    )
+
+
+def metadata_exists(output_dir: str) -> bool:
+    return bool(_list_parquet_parts(os.path.join(output_dir, METADATA_PARQUET))) or os.path.exists(
+        os.path.join(output_dir, METADATA_CSV)
+    )
+
+
+def remove_metadata(output_dir: str) -> None:
+    """Delete the metadata of ``output_dir`` in either format."""
+    csv_path = os.path.join(output_dir, METADATA_CSV)
+    if os.path.exists(csv_path):
+        os.remove(csv_path)
+    parquet_dir = os.path.join(output_dir, METADATA_PARQUET)
+    if os.path.isdir(parquet_dir):
+        for f in os.listdir(parquet_dir):
+            os.remove(os.path.join(parquet_dir, f))
+        os.rmdir(parquet_dir)
+
+
+def replace_metadata(metadata_format: str, output_dir: str, rows: List[Dict]) -> None:
+    """
+    Replace the metadata of ``output_dir`` (in either format) with ``rows``.
+    The new metadata is complete on disk before the old one is deleted, so a crash
+    in between leaves duplicate rows (which resume drops), never a missing metadata file.
+    """
+    if metadata_format not in METADATA_FORMATS:
+        raise ValueError(
+            f"Unsupported metadata format: {metadata_format} - Valid formats are {METADATA_FORMATS}"
+        )
+    if not rows:
+        remove_metadata(output_dir)
+        return
+
+    csv_path = os.path.join(output_dir, METADATA_CSV)
+    parquet_dir = os.path.join(output_dir, METADATA_PARQUET)
+    if metadata_format == "csv":
+        tmp_path = csv_path + ".tmp"
+        _csv_frame(rows).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, csv_path)
+        stale = _list_parquet_parts(parquet_dir)
+    else:
+        stale = _list_parquet_parts(parquet_dir)
+        # append writes the new part atomically, after the existing ones
+        ParquetMetadataWriter(output_dir).append(rows)
+        if os.path.exists(csv_path):
+            os.remove(csv_path)
+    for path in stale:
+        os.remove(path)
+    if metadata_format == "csv" and os.path.isdir(parquet_dir) and not os.listdir(parquet_dir):
+        os.rmdir(parquet_dir)
+
+
+def read_metadata(output_dir: str) -> pd.DataFrame:
+    """
+    Metadata of ``output_dir`` as a DataFrame with list-valued ``classes``/``x``/``y``/``z``.
+    Parquet metadata is preferred over CSV; returns an empty frame if there is neither.
+    A CSV row cut off by a crash is dropped.
+    """
+    parts = _list_parquet_parts(os.path.join(output_dir, METADATA_PARQUET))
+    if parts:
+        pa, pq = _require_pyarrow()
+        df = pa.concat_tables([pq.read_table(p) for p in parts]).to_pandas()
+        for col in LIST_COLUMNS:
+            df[col] = df[col].map(list)
+        return df
+
+    csv_path = os.path.join(output_dir, METADATA_CSV)
+    if not os.path.exists(csv_path):
+        return pd.DataFrame()
+    try:
+        df = pd.read_csv(csv_path, on_bad_lines="skip")
+    except (pd.errors.EmptyDataError, pd.errors.ParserError):
+        return pd.DataFrame()
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: _split_list(v, str if col == "classes" else float))
+    return df
+
+
+def list_shards(output_dir: str) -> List[str]:
+    """Sorted paths of all complete ``.npy`` shards in ``output_dir``."""
+    return sorted(
+        os.path.join(output_dir, f)
+        for f in os.listdir(output_dir)
+        if f.startswith("shard-") and f.endswith(".npy")
+    )
+
+
+def iter_shard_samples(output_dir: str) -> Iterator[Tuple[Dict, np.ndarray]]:
+    """Yield (metadata_row, audio) for every sample stored in the shards of ``output_dir``."""
+    for path in list_shards(output_dir):
+        audio = np.load(path, mmap_mode="r")
+        with open(path[: -len(".npy")] + ".json", "r", encoding="utf-8") as f:
+            rows = json.load(f)["samples"]
+        for row in rows:
+            yield row, audio[row["shard_offset"]]
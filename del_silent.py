@@ -1,9 +1,17 @@
 from pydub import AudioSegment
 from pydub.silence import detect_nonsilent
 import os
+import csv
+import json
+import hashlib
+import multiprocessing as mp
+from functools import partial
+import numpy as np
+import soundfile as sf
+from numpy.lib.stride_tricks import sliding_window_view
 
 
-from typing import List, Optional, Sequence, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 import math
 
 
@@ -26,75 +34,84 @@ def _compute_silence_threshold(
     if audio.dBFS == float("-inf"):
         return -55.0
 
+    return _estimate_silence_threshold(
+        np.asarray(audio.get_array_of_samples()),
+        audio.channels,
+        audio.frame_rate,
+        float(audio.max_possible_amplitude),
+        audio.dBFS,
+    )
+
+
+def _estimate_silence_threshold(
+    samples: np.ndarray,
+    channels: int,
+    frame_rate: int,
+    max_possible: float,
+    dbfs: float,
+) -> float:
+    """Estimate the dBFS silence threshold of interleaved ``samples``.
+
+    ``max_possible`` is the full-scale amplitude of the samples and ``dbfs``
+    the loudness of the whole clip (see ``_compute_silence_threshold``).
+    """
     # Windowed RMS dBFS to estimate noise floor and peak more robustly than
-    # using the global average. Keep dependencies minimal (no numpy).
+    # using the global average.
     window_ms = 50  # analysis window
     hop_ms = 25  # hop size
 
-    samples = audio.get_array_of_samples()
-    if not samples:
-        return max(-60.0, audio.dBFS - 24.0)
-
-    # Convert to mono by averaging interleaved channels for RMS
-    channels = audio.channels
-    frame_rate = audio.frame_rate
-    max_possible = float(audio.max_possible_amplitude)
+    if not samples.size:
+        return max(-60.0, dbfs - 24.0)
 
     samples_per_ms = (frame_rate * channels) / 1000.0
     win = max(1, int(samples_per_ms * window_ms))
     hop = max(1, int(samples_per_ms * hop_ms))
 
-    # Compute RMS in sliding windows
-    rms_db_values: List[float] = []
-    total_samples = len(samples)
-    idx = 0
-    while idx + win <= total_samples:
-        # Average across channels per frame
-        # Note: samples are interleaved by channel already
-        # Compute RMS directly on interleaved data which approximates mono RMS
-        acc = 0.0
-        for s in samples[idx : idx + win]:
-            acc += float(s) * float(s)
-        mean_sq = acc / win
-        if mean_sq <= 0.0 or max_possible <= 0.0:
-            db = float("-inf")
-        else:
-            rms = math.sqrt(mean_sq)
-            ratio = rms / max_possible
-            # Avoid log of zero
-            if ratio <= 0.0:
-                db = float("-inf")
-            else:
-                db = 20.0 * math.log10(ratio)
-        rms_db_values.append(db)
-        idx += hop
+    # Sum of squares of every window (windows start every hop and must fit).
+    # The RMS is taken directly on the interleaved data, which approximates mono RMS.
+    # Each window is summed left to right (cumsum), so the sums round exactly like a
+    # plain float accumulation; windows are done in chunks to bound memory.
+    squares = samples.astype(np.float64) ** 2
+    n_windows = (squares.size - win) // hop + 1 if squares.size >= win else 0
+    window_sums = np.empty(n_windows)
+    if n_windows:
+        windows = sliding_window_view(squares, win)[::hop]
+        chunk = max(1, (1 << 22) // win)
+        for i in range(0, n_windows, chunk):
+            window_sums[i : i + chunk] = np.cumsum(windows[i : i + chunk], axis=1)[:, -1]
+    mean_sq = window_sums / win
+
+    # dB is monotonic in the mean square, so sort the mean squares and only convert the
+    # handful of values the percentile and peak need
+    if max_possible > 0.0:
+        finite_sq = np.sort(mean_sq[mean_sq > 0.0])
+    else:
+        finite_sq = mean_sq[:0]
 
     # Fallback if something went wrong
-    finite_vals = [v for v in rms_db_values if math.isfinite(v)]
-    if not finite_vals:
+    if not finite_sq.size:
         # Use a conservative threshold relative to average loudness
-        return max(-60.0, audio.dBFS - 24.0)
+        return max(-60.0, dbfs - 24.0)
 
-    finite_vals.sort()
+    def to_db(mean_square: float) -> float:
+        return 20.0 * math.log10(math.sqrt(mean_square) / max_possible)
 
-    def percentile(sorted_vals: List[float], q: float) -> float:
+    def percentile(sorted_sq: np.ndarray, q: float) -> float:
         # q in [0, 1]
-        if not sorted_vals:
-            return float("-inf")
         if q <= 0:
-            return sorted_vals[0]
+            return to_db(float(sorted_sq[0]))
         if q >= 1:
-            return sorted_vals[-1]
-        pos = (len(sorted_vals) - 1) * q
+            return to_db(float(sorted_sq[-1]))
+        pos = (len(sorted_sq) - 1) * q
         low = int(math.floor(pos))
         high = int(math.ceil(pos))
         if low == high:
-            return sorted_vals[low]
+            return to_db(float(sorted_sq[low]))
         frac = pos - low
-        return sorted_vals[low] * (1 - frac) + sorted_vals[high] * frac
+        return to_db(float(sorted_sq[low])) * (1 - frac) + to_db(float(sorted_sq[high])) * frac
 
-    noise_floor_db = percentile(finite_vals, 0.10)  # 10th percentile
-    peak_db = finite_vals[-1]
+    noise_floor_db = percentile(finite_sq, 0.10)  # 10th percentile
+    peak_db = to_db(float(finite_sq[-1]))
 
     # Combine heuristics:
     # - noise floor + margin keeps audible tails
@@ -129,6 +146,262 @@ def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
     return merged
 
 
+# Formats trimmed with soundfile/NumPy; anything else goes through pydub (and ffmpeg)
+NATIVE_EXTENSIONS = (".wav", ".flac", ".aif", ".aiff")
+
+# soundfile dtype and full-scale amplitude for reading each subtype losslessly
+_INT_SUBTYPES = {
+    "PCM_S8": ("int16", 32768.0),
+    "PCM_U8": ("int16", 32768.0),
+    "PCM_16": ("int16", 32768.0),
+    "PCM_24": ("int32", 2147483648.0),
+    "PCM_32": ("int32", 2147483648.0),
+}
+
+
+def _read_samples(path: str) -> Tuple[np.ndarray, int, str, float]:
+    """Read ``path`` with soundfile as (frames, channels) samples.
+
+    PCM files are read as integers so writing them back is lossless. Returns
+    (samples, frame_rate, subtype, full-scale amplitude).
+    """
+    info = sf.info(path)
+    dtype, max_possible = _INT_SUBTYPES.get(info.subtype, ("float32", 1.0))
+    data, frame_rate = sf.read(path, dtype=dtype, always_2d=True)
+    return data, frame_rate, info.subtype, max_possible
+
+
+def _silence_threshold_from_samples(
+    data: np.ndarray, frame_rate: int, max_possible: float, silence_thresh: Optional[float]
+) -> float:
+    """``_compute_silence_threshold`` for (frames, channels) samples from ``_read_samples``."""
+    if silence_thresh is not None:
+        return silence_thresh
+    mean_square = float(np.mean(np.square(data, dtype=np.float64))) if data.size else 0.0
+    if mean_square <= 0.0:
+        return -55.0
+    dbfs = 20.0 * math.log10(math.sqrt(mean_square) / max_possible)
+    return _estimate_silence_threshold(data.reshape(-1), data.shape[1], frame_rate, max_possible, dbfs)
+
+
+def _detect_nonsilent_frames(
+    data: np.ndarray,
+    frame_rate: int,
+    min_silence_len: int,
+    silence_thresh: float,
+    max_possible: float,
+) -> List[Tuple[int, int]]:
+    """Non-silent (start_frame, end_frame) regions of (frames, channels) samples.
+
+    Same rule as pydub's ``detect_nonsilent`` but evaluated at every frame
+    instead of every millisecond: a window of ``min_silence_len`` ms is silent
+    when its RMS is at most ``silence_thresh`` dBFS, silence is the union of
+    the silent windows, and everything else is non-silent.
+    """
+    n_frames = len(data)
+    win = max(1, int(min_silence_len * frame_rate / 1000))
+    if n_frames < win:
+        return [(0, n_frames)]
+
+    # Mean square per frame (over channels) relative to full scale, then per window via cumsum
+    energy = np.square(data / max_possible, dtype=np.float64).mean(axis=1)
+    cumulative = np.concatenate(([0.0], np.cumsum(energy)))
+    window_energy = (cumulative[win:] - cumulative[:-win]) / win
+    silent_starts = np.flatnonzero(window_energy <= (10.0 ** (silence_thresh / 20.0)) ** 2)
+
+    # Frames covered by any silent window
+    coverage = np.zeros(n_frames + 1, dtype=np.int64)
+    np.add.at(coverage, silent_starts, 1)
+    np.add.at(coverage, silent_starts + win, -1)
+    silent = np.cumsum(coverage[:-1]) > 0
+
+    # Runs of non-silent frames
+    edges = np.diff(np.concatenate(([True], silent, [True])).astype(np.int8))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    return [(int(start), int(end)) for start, end in zip(starts, ends)]
+
+
+def _keep_ranges(
+    non_silent: List[Tuple[int, int]],
+    length: int,
+    keep_silence: int,
+    remove_interior: bool,
+    trim_leading: bool,
+    trim_trailing: bool,
+) -> List[Tuple[int, int]]:
+    """The (start, end) ranges to keep, in the same unit as ``non_silent``, ``length`` and ``keep_silence``."""
+    if not non_silent:
+        # Nothing detected as non-silent; keep original to avoid empty outputs
+        return [(0, length)]
+    if remove_interior:
+        # Expand each non-silent chunk by keep_silence on both sides then merge
+        expanded: List[Tuple[int, int]] = []
+        for start, end in non_silent:
+            start_expanded = max(0, start - keep_silence)
+            end_expanded = min(length, end + keep_silence)
+            expanded.append((start_expanded, end_expanded))
+        return _merge_intervals(expanded)
+    # Trim only the edges
+    start, end = non_silent[0][0], non_silent[-1][1]
+    if trim_leading:
+        start = max(0, start - keep_silence)
+    else:
+        start = 0
+    if trim_trailing:
+        end = min(length, end + keep_silence)
+    else:
+        end = length
+    return [(start, end)]
+
+
+def _write_samples(data: np.ndarray, frame_rate: int, subtype: str, dest_path: str) -> None:
+    """Write samples with soundfile, keeping ``subtype`` where the destination format supports it."""
+    ext = os.path.splitext(dest_path)[1].lower().lstrip(".")
+    major = {"aif": "AIFF"}.get(ext, ext.upper())
+    sf.write(dest_path, data, frame_rate, subtype=subtype if sf.check_format(major, subtype) else None)
+
+
+def _destination(input_path: str, output_path: Optional[str]) -> str:
+    """The file a trim writes to: ``output_path`` (``.wav`` added if it has no extension), or ``input_path``."""
+    dest_path = input_path if output_path is None else output_path
+    if not os.path.splitext(dest_path)[1]:
+        # Default to wav if no extension provided
+        dest_path = dest_path + ".wav"
+    return dest_path
+
+
+def plan_trim_file(
+    input_path: str,
+    output_path: Optional[str] = None,
+    *,
+    min_silence_len: int = 150,
+    silence_thresh: Optional[float] = None,
+    keep_silence: int = 0,
+    remove_interior: bool = False,
+    trim_leading: bool = True,
+    trim_trailing: bool = True,
+    backend: str = "auto",
+) -> Dict:
+    """Work out how a file would be trimmed, without writing anything.
+
+    Takes the same arguments as ``trim_silence_file``. Returns a plan entry
+    (a JSON-friendly dict) that ``apply_trim`` writes out:
+
+        input_path, output_path   source, and destination (None for in place)
+        backend                   "numpy" or "pydub"
+        unit                      "frames" (numpy) or "ms" (pydub): the unit of the lengths and ranges
+        frame_rate                sample rate of the input
+        threshold_db              silence threshold used, in dBFS
+        length, new_length        length before and after trimming
+        non_silent                detected non-silent (start, end) regions
+        keep                      (start, end) ranges that are kept, in order
+        size, mtime_ns            input file stat when planned
+        params                    hash of the trim settings (see ``TRIM_CACHE_FILE``)
+    """
+    if backend not in ("auto", "numpy", "pydub"):
+        raise ValueError(f"Unknown backend {backend!r}; expected 'auto', 'numpy' or 'pydub'")
+    if backend == "auto":
+        exts = (os.path.splitext(p)[1].lower() for p in (input_path, _destination(input_path, output_path)))
+        backend = "numpy" if all(e in NATIVE_EXTENSIONS for e in exts) else "pydub"
+
+    st = os.stat(input_path)
+    if backend == "numpy":
+        data, frame_rate, _subtype, max_possible = _read_samples(input_path)
+        threshold = _silence_threshold_from_samples(data, frame_rate, max_possible, silence_thresh)
+        non_silent = _detect_nonsilent_frames(data, frame_rate, min_silence_len, threshold, max_possible)
+        length = len(data)
+        keep = int(keep_silence * frame_rate / 1000)
+        unit = "frames"
+    else:
+        audio = AudioSegment.from_file(input_path)
+        threshold = _compute_silence_threshold(audio, silence_thresh)
+
+        # Find all non-silent regions
+        non_silent = detect_nonsilent(
+            audio,
+            min_silence_len=min_silence_len,
+            silence_thresh=threshold,
+            seek_step=1,
+        )
+        frame_rate = audio.frame_rate
+        length = len(audio)
+        keep = keep_silence
+        unit = "ms"
+
+    ranges = _keep_ranges(
+        [tuple(region) for region in non_silent], length, keep, remove_interior, trim_leading, trim_trailing
+    )
+    return {
+        "input_path": input_path,
+        "output_path": output_path,
+        "backend": backend,
+        "unit": unit,
+        "frame_rate": frame_rate,
+        "threshold_db": float(threshold),
+        "length": length,
+        "new_length": sum(end - start for start, end in ranges),
+        "non_silent": [[int(start), int(end)] for start, end in non_silent],
+        "keep": [[int(start), int(end)] for start, end in ranges],
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "params": _trim_params_key(
+            dict(
+                min_silence_len=min_silence_len,
+                silence_thresh=silence_thresh,
+                keep_silence=keep_silence,
+                remove_interior=remove_interior,
+                trim_leading=trim_leading,
+                trim_trailing=trim_trailing,
+            )
+        ),
+    }
+
+
+def apply_trim(entry: Dict) -> str:
+    """Write out one ``plan_trim_file`` entry and return the path written.
+
+    In-place trims go to a temp file next to the input that then atomically
+    replaces it, and are skipped when there is nothing to cut. Raises
+    RuntimeError if the input changed since it was planned.
+    """
+    input_path = entry["input_path"]
+    output_path = entry.get("output_path") or None
+    st = os.stat(input_path)
+    if (st.st_size, st.st_mtime_ns) != (int(entry["size"]), int(entry["mtime_ns"])):
+        raise RuntimeError("file changed since it was planned; plan it again")
+
+    keep = [(int(start), int(end)) for start, end in entry["keep"]]
+    if output_path is None and keep == [(0, int(entry["length"]))]:
+        return input_path
+
+    if output_path is None:
+        directory, filename = os.path.split(input_path)
+        name, ext = os.path.splitext(filename)
+        dest_path = os.path.join(directory or ".", f"{name}.__tmp__{ext}")
+    else:
+        dest_path = _destination(input_path, output_path)
+        parent = os.path.dirname(dest_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+    if entry["backend"] == "numpy":
+        data, frame_rate, subtype, _max_possible = _read_samples(input_path)
+        trimmed = np.concatenate([data[start:end] for start, end in keep])
+        _write_samples(trimmed, frame_rate, subtype, dest_path)
+    else:
+        audio = AudioSegment.from_file(input_path)
+        trimmed = AudioSegment.empty()
+        for start, end in keep:
+            trimmed += audio[start:end]
+        trimmed.export(dest_path, format=os.path.splitext(dest_path)[1].lower().lstrip("."))
+
+    if output_path is None:
+        os.replace(dest_path, input_path)
+        return input_path
+    return dest_path
+
+
 def trim_silence_file(
     input_path: str,
     output_path: Optional[str] = None,
@@ -139,6 +412,7 @@ def trim_silence_file(
     remove_interior: bool = False,
     trim_leading: bool = True,
     trim_trailing: bool = True,
+    backend: str = "auto",
 ) -> str:
     """Trim silence from an audio file and write the result.
 
@@ -146,6 +420,9 @@ def trim_silence_file(
     with obvious trailing ends. If ``remove_interior`` is True, all silent parts
     are removed, concatenating non-silent chunks.
 
+    WAV/FLAC/AIFF files are trimmed sample-accurately with soundfile and NumPy;
+    other formats go through pydub (and ffmpeg).
+
     Args:
         input_path: Path to the input audio file.
         output_path: Where to save the trimmed file. If None, replaces input in-place.
@@ -155,72 +432,229 @@ def trim_silence_file(
         remove_interior: If True, delete silence anywhere (not just edges).
         trim_leading: If False, keep leading portion even if silent.
         trim_trailing: If False, keep trailing portion even if silent.
+        backend: "numpy", "pydub", or "auto" to use NumPy when both input and
+            output are in ``NATIVE_EXTENSIONS``.
 
     Returns:
         Path to the written file (same as input if in-place).
     """
-    audio = AudioSegment.from_file(input_path)
-    threshold = _compute_silence_threshold(audio, silence_thresh)
-
-    # Find all non-silent regions
-    non_silent: List[Tuple[int, int]] = detect_nonsilent(
-        audio,
+    entry = plan_trim_file(
+        input_path,
+        output_path,
         min_silence_len=min_silence_len,
-        silence_thresh=threshold,
-        seek_step=1,
+        silence_thresh=silence_thresh,
+        keep_silence=keep_silence,
+        remove_interior=remove_interior,
+        trim_leading=trim_leading,
+        trim_trailing=trim_trailing,
+        backend=backend,
     )
+    return apply_trim(entry)
 
-    if not non_silent:
-        # Nothing detected as non-silent; keep original to avoid empty outputs
-        trimmed = audio
-    else:
-        if remove_interior:
-            # Expand each non-silent chunk by keep_silence on both sides then merge
-            expanded: List[Tuple[int, int]] = []
-            for start, end in non_silent:
-                start_expanded = max(0, start - keep_silence)
-                end_expanded = min(len(audio), end + keep_silence)
-                expanded.append((start_expanded, end_expanded))
-            chunks = _merge_intervals(expanded)
-            trimmed = AudioSegment.empty()
-            for start, end in chunks:
-                trimmed += audio[start:end]
-        else:
-            # Trim only the edges
-            start, end = non_silent[0][0], non_silent[-1][1]
-            if trim_leading:
-                start = max(0, start - keep_silence)
-            else:
-                start = 0
-            if trim_trailing:
-                end = min(len(audio), end + keep_silence)
-            else:
-                end = len(audio)
-            trimmed = audio[start:end]
-
-    # Determine export format from output path or input extension
-    def _export(audio_seg: AudioSegment, dest_path: str) -> None:
-        ext = os.path.splitext(dest_path)[1].lower().lstrip(".")
-        if not ext:
-            # Default to wav if no extension provided
-            dest_path = dest_path + ".wav"
-            ext = "wav"
-        audio_seg.export(dest_path, format=ext)
 
-    if output_path is None:
-        # In-place: export to a temp file next to input then atomically replace
-        directory, filename = os.path.split(input_path)
-        name, ext = os.path.splitext(filename)
-        temp_path = os.path.join(directory or ".", f"{name}.__tmp__{ext}")
-        _export(trimmed, temp_path)
-        os.replace(temp_path, input_path)
-        return input_path
+def _find_audio_files(root_dir: str, extensions: Sequence[str]) -> List[str]:
+    exts = tuple(e.lower() for e in extensions)
+    paths = []
+    for dirpath, _dirnames, filenames in os.walk(root_dir):
+        for fname in filenames:
+            if os.path.splitext(fname)[1].lower() in exts:
+                paths.append(os.path.join(dirpath, fname))
+    return sorted(paths)
+
+
+def _plan_worker(path: str, options: Dict) -> Dict:
+    try:
+        return plan_trim_file(path, **options)
+    except Exception as exc:
+        return {"input_path": path, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _apply_worker(entry: Dict) -> Dict:
+    try:
+        apply_trim(entry)
+        return entry
+    except Exception as exc:
+        return {**entry, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def _run_jobs(fn, items: Sequence, jobs: Optional[int]) -> Iterator:
+    """``map(fn, items)`` in order, on a process pool when ``jobs`` is not 1 (None: one per CPU)."""
+    if jobs is None:
+        jobs = mp.cpu_count()
+    if jobs <= 1 or len(items) <= 1:
+        yield from map(fn, items)
+        return
+    with mp.Pool(processes=min(jobs, len(items))) as pool:
+        yield from pool.imap(fn, items, chunksize=max(1, min(16, len(items) // (4 * jobs))))
+
+
+def plan_files(
+    paths: Sequence[str],
+    *,
+    root_dir: Optional[str] = None,
+    jobs: Optional[int] = 1,
+    show_progress: bool = True,
+    **options,
+) -> List[Dict]:
+    """Plan the in-place trim of each file in ``paths``.
+
+    ``options`` are the ``trim_silence_file`` keyword arguments. Files that
+    can't be planned get an entry with only ``input_path`` and ``error``.
+    With ``root_dir``, entries carry it so that ``apply_trim_plan`` records
+    them in that folder's ``TRIM_CACHE_FILE``.
+    Runs on ``jobs`` worker processes (None: one per CPU).
+    """
+    plan = []
+    for entry in _run_jobs(partial(_plan_worker, options=options), paths, jobs):
+        if root_dir is not None and "error" not in entry:
+            entry["root_dir"] = root_dir
+        plan.append(entry)
+        if show_progress and "error" in entry:
+            print(f"Failed: {entry['input_path']} -> {entry['error']}")
+    return plan
+
+
+def plan_directory(
+    root_dir: str,
+    *,
+    extensions: Sequence[str] = (".wav", ".mp3", ".flac", ".ogg", ".m4a", ".aac"),
+    jobs: Optional[int] = 1,
+    show_progress: bool = True,
+    **options,
+) -> List[Dict]:
+    """``plan_files`` for every audio file under ``root_dir``."""
+    return plan_files(
+        _find_audio_files(root_dir, extensions),
+        root_dir=root_dir,
+        jobs=jobs,
+        show_progress=show_progress,
+        **options,
+    )
+
+
+def apply_trim_plan(
+    plan: Sequence[Dict],
+    *,
+    jobs: Optional[int] = 1,
+    show_progress: bool = True,
+    use_cache: bool = True,
+) -> List[Dict]:
+    """Apply plan entries (from ``plan_directory`` or ``read_trim_plan``) on ``jobs`` processes.
+
+    Entries with an ``error`` are skipped. Returns the entries that were applied.
+    Applied in-place entries that carry a ``root_dir`` are recorded in that
+    folder's ``TRIM_CACHE_FILE`` (unless ``use_cache`` is False), so a later
+    ``trim_directory_inplace`` with the same settings skips them.
+    """
+    todo = [entry for entry in plan if "error" not in entry]
+    applied = []
+    for entry in _run_jobs(_apply_worker, todo, jobs):
+        if "error" in entry:
+            if show_progress:
+                print(f"Failed: {entry['input_path']} -> {entry['error']}")
+            continue
+        applied.append(entry)
+        if show_progress:
+            # Nothing to cut: the file was left alone, or copied as is to its output_path
+            removed = int(entry["length"]) - int(entry["new_length"])
+            print(f"{'Trimmed' if removed > 0 else 'Unchanged'}: {entry['input_path']}")
+    if use_cache:
+        _record_trimmed(applied)
+    return applied
+
+
+# Sidecar in the trimmed folder recording which files are already trimmed, and with which settings
+TRIM_CACHE_FILE = ".trim_cache.json"
+
+
+def _trim_params_key(options: Dict) -> str:
+    """Hash of the trim settings; a file is only skipped when it was trimmed with the same ones."""
+    payload = json.dumps(options, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def load_trim_cache(path: str) -> Dict[str, Dict]:
+    """Read a trim cache: relative path -> {"size", "mtime_ns", "params"} of the file after trimming."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        # Corrupt cache: start over, everything gets planned again
+        return {}
+
+
+def save_trim_cache(cache: Dict[str, Dict], path: str) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _is_trimmed(cache: Dict[str, Dict], root_dir: str, path: str, params: str) -> bool:
+    record = cache.get(os.path.relpath(path, root_dir))
+    if record is None or record.get("params") != params:
+        return False
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns) == (record.get("size"), record.get("mtime_ns"))
+
+
+def _record_trimmed(entries: Sequence[Dict]) -> None:
+    """Record applied in-place plan entries in the trim cache of their ``root_dir``."""
+    by_root: Dict[str, List[Dict]] = {}
+    for entry in entries:
+        if entry.get("output_path") or not entry.get("root_dir") or not entry.get("params"):
+            continue
+        by_root.setdefault(entry["root_dir"], []).append(entry)
+    for root_dir, group in by_root.items():
+        cache_path = os.path.join(root_dir, TRIM_CACHE_FILE)
+        cache = load_trim_cache(cache_path)
+        for entry in group:
+            st = os.stat(entry["input_path"])
+            cache[os.path.relpath(entry["input_path"], root_dir)] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "params": entry["params"],
+            }
+        save_trim_cache(cache, cache_path)
+
+
+_PLAN_LIST_FIELDS = ("non_silent", "keep")
+
+
+def write_trim_plan(plan: Sequence[Dict], path: str) -> None:
+    """Write a trim plan for review, as CSV if ``path`` ends in .csv, otherwise JSON."""
+    if path.lower().endswith(".csv"):
+        fields: List[str] = []
+        for entry in plan:
+            fields.extend(k for k in entry if k not in fields)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for entry in plan:
+                writer.writerow(
+                    {k: json.dumps(v) if k in _PLAN_LIST_FIELDS else v for k, v in entry.items()}
+                )
     else:
-        parent = os.path.dirname(output_path)
-        if parent:
-            os.makedirs(parent, exist_ok=True)
-        _export(trimmed, output_path)
-        return output_path
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(list(plan), f, indent=1)
+
+
+def read_trim_plan(path: str) -> List[Dict]:
+    """Read a plan written by ``write_trim_plan``."""
+    if not path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    plan = []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            entry = {k: v for k, v in row.items() if v != ""}
+            for k in _PLAN_LIST_FIELDS:
+                if k in entry:
+                    entry[k] = json.loads(entry[k])
+            plan.append(entry)
+    return plan
 
 
 def trim_directory_inplace(
@@ -234,9 +668,21 @@ def trim_directory_inplace(
     trim_leading: bool = True,
     trim_trailing: bool = True,
     show_progress: bool = True,
-) -> None:
+    jobs: Optional[int] = 1,
+    plan_path: Optional[str] = None,
+    dry_run: bool = False,
+    use_cache: bool = True,
+) -> List[Dict]:
     """Recursively trim silence from all audio files under ``root_dir`` in place.
 
+    Every file is planned first (see ``plan_trim_file``), then the plan is
+    applied; both passes run on ``jobs`` worker processes.
+
+    Files are recorded in ``TRIM_CACHE_FILE`` under ``root_dir`` once trimmed.
+    A later run skips a file whose size and mtime still match its record and
+    whose record has the same trim settings, without decoding it, so in-place
+    trims are not compounded.
+
     Args:
         root_dir: Directory to process.
         extensions: File extensions to include (lowercased, with dots).
@@ -247,32 +693,48 @@ def trim_directory_inplace(
         trim_leading: If False, keep leading portion even if silent.
         trim_trailing: If False, keep trailing portion even if silent.
         show_progress: If True, prints progress to stdout.
+        jobs: Worker processes; None uses one per CPU.
+        plan_path: If set, also write the plan here (.json or .csv) for review.
+        dry_run: If True, only plan; nothing is written except ``plan_path``.
+        use_cache: If False, ignore and don't update the trim cache.
+
+    Returns:
+        The plan (without the files skipped through the cache).
     """
-    exts = tuple(e.lower() for e in extensions)
-    processed = 0
-    for dirpath, _dirnames, filenames in os.walk(root_dir):
-        for fname in filenames:
-            if os.path.splitext(fname)[1].lower() in exts:
-                fpath = os.path.join(dirpath, fname)
-                try:
-                    trim_silence_file(
-                        fpath,
-                        output_path=None,
-                        min_silence_len=min_silence_len,
-                        silence_thresh=silence_thresh,
-                        keep_silence=keep_silence,
-                        remove_interior=remove_interior,
-                        trim_leading=trim_leading,
-                        trim_trailing=trim_trailing,
-                    )
-                    processed += 1
-                    if show_progress:
-                        print(f"Trimmed: {fpath}")
-                except Exception as exc:
-                    if show_progress:
-                        print(f"Failed: {fpath} -> {exc}")
+    options = dict(
+        min_silence_len=min_silence_len,
+        silence_thresh=silence_thresh,
+        keep_silence=keep_silence,
+        remove_interior=remove_interior,
+        trim_leading=trim_leading,
+        trim_trailing=trim_trailing,
+    )
+    params = _trim_params_key(options)
+    cache_path = os.path.join(root_dir, TRIM_CACHE_FILE)
+    cache = load_trim_cache(cache_path) if use_cache else {}
+
+    paths = _find_audio_files(root_dir, extensions)
+    todo = [path for path in paths if not _is_trimmed(cache, root_dir, path, params)]
+    if show_progress and len(todo) < len(paths):
+        print(f"Skipping {len(paths) - len(todo)} files already trimmed with these settings.")
+
+    plan = plan_files(todo, root_dir=root_dir, jobs=jobs, show_progress=show_progress, **options)
+    if plan_path:
+        write_trim_plan(plan, plan_path)
+        if show_progress:
+            print(f"Wrote trim plan: {plan_path}")
+
+    if dry_run:
+        if show_progress:
+            planned = [entry for entry in plan if "error" not in entry]
+            to_trim = sum(1 for entry in planned if entry["new_length"] < entry["length"])
+            print(f"Dry run. {to_trim} of {len(planned)} files under '{root_dir}' would be trimmed.")
+        return plan
+
+    applied = apply_trim_plan(plan, jobs=jobs, show_progress=show_progress, use_cache=use_cache)
     if show_progress:
-        print(f"Done. Processed {processed} files under '{root_dir}'.")
+        print(f"Done. Processed {len(applied)} files under '{root_dir}'.")
+    return plan
 
 
 if __name__ == "__main__":
@@ -287,4 +749,5 @@ if __name__ == "__main__":
         trim_leading=False,
         trim_trailing=False,
         show_progress=True,
+        jobs=None,
     )
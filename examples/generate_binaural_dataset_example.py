@@ -9,7 +9,7 @@ from IPython.display import Audio
 import matplotlib.pyplot as plot
 import numpy as np
 import pandas as pd
-import librosa
+from binamix.io import load_audio
 import soundfile as sf
 from binamix.sadie_utilities import *
 import os
@@ -53,7 +53,7 @@ for file_name in wav_files:
 
     # Load the audio file using the IR sample rate
     input_file_name = f"{filepath}{file_name}"
-    input_file , sr = librosa.load(input_file_name, sr=sample_rate, mono=True)
+    input_file , sr = load_audio(input_file_name, sr=sample_rate, mono=True)
 
     for ir_type in ir_types:
 
@@ -69,7 +69,7 @@ for file_name in wav_files:
                 angle_file = f"{angle_path}{angle_ir}"
 
                 # Load the IR
-                ir , sr = librosa.load(angle_file, sr=None, mono=False) 
+                ir , sr = load_audio(angle_file, sr=None, mono=False) 
 
                 # Convolve the audio file with the IRs
                 ir_left = ir[0]
@@ -10,6 +10,24 @@ output_path = "./output/"
 # Generate transcodes
 generate_transcodes(input_path, output_path)
 
+# A list of files goes through one job queue (all files x bitrates run concurrently).
+# Each result has an "error" entry that is None on success.
+# import glob
+# results = generate_transcodes(glob.glob("./audio/*.wav"), output_path,
+#                               progress=lambda done, total, result: print(f"{done}/{total}", result["output"] or result["error"]))
+
+# pipe=True streams PCM through opusenc | opusdec without writing any .opus files.
+# generate_transcodes(input_path, output_path, pipe=True)
+
+# backend="soundfile" encodes in process with libsndfile, so the opus-tools binaries are not needed.
+# generate_transcodes(input_path, output_path, backend="soundfile")
+
+# The degraded audio can also be kept in memory, e.g. for augmentation:
+# import soundfile as sf
+# from binamix.opus_transcode_utilities import opus_round_trip
+# audio, sr = sf.read(input_path)
+# degraded = opus_round_trip(audio, sr, 64)
+
 # The script will generate the following files in the same folder as the input file:
 # example_opus32k.wav
 # example_opus64k.wav
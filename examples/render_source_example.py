@@ -1,5 +1,5 @@
 # Imports
-import librosa
+from binamix.io import load_audio
 import soundfile as sf
 from binamix.sadie_utilities import *
 
@@ -16,7 +16,7 @@ elevation = 20
 mode = "nearest"            # Options: nearest, planar, two-point, three-point, auto
 
 # Load the audio files
-vocals, sr = librosa.load(audio_path, sr=44100, mono=True, duration=10)
+vocals, sr = load_audio(audio_path, sr=44100, mono=True, duration=10)
 
 # Render a single source at a given azimuth and elevation
 output = render_source(vocals, subject_id, sr, ir_type, speaker_layout, azimuth, elevation, mode=mode)
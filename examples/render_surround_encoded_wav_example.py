@@ -1,6 +1,6 @@
 # Imports
 import pandas as pd
-import librosa
+from binamix.io import load_audio
 import soundfile as sf
 from binamix.sadie_utilities import *
 from binamix.file_utilities import *
@@ -28,7 +28,7 @@ input_layout = "7.1.4"    # The actual channel layout of the input audio file
 render_layout = "7.1.4"   # The layout that you want to render the audio to. Normally the same as the input_layout but can be any layout with a lower number of channels.
 
 # Load the surround audio file. Dolby Channel ordering is assumed for the input audio file                           
-surround_container, sr = librosa.load(f"{audio_path}", sr=48000, mono=False)
+surround_container, sr = load_audio(f"{audio_path}", sr=48000, mono=False)
 
 # Call the render_surround_to_binaural function. You must specify the correct input_layout associated with the input audio file.
 # The render_layout is the layout that you want to render the audio to. Normally the same as the input_layout but can be any layout with a lower number of channels.
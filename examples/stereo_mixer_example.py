@@ -1,6 +1,6 @@
 # Imports
 import pandas as pd
-import librosa
+from binamix.io import load_audio
 import soundfile as sf
 from binamix.sadie_utilities import *
 
@@ -11,10 +11,10 @@ song_id = "Angels In Amplifiers - I'm Alright"
 
 
 # Load the audio files
-bass, sr = librosa.load(f"{audio_path}{song_id}/bass.wav", sr=44100, mono=True, duration=10)
-drums, sr = librosa.load(f"{audio_path}{song_id}/drums.wav", sr=44100, mono=True, duration=10)
-other, sr = librosa.load(f"{audio_path}{song_id}/other.wav", sr=44100, mono=True, duration=10)
-vocals, sr = librosa.load(f"{audio_path}{song_id}/vocals.wav", sr=44100, mono=True, duration=10)
+bass, sr = load_audio(f"{audio_path}{song_id}/bass.wav", sr=44100, mono=True, duration=10)
+drums, sr = load_audio(f"{audio_path}{song_id}/drums.wav", sr=44100, mono=True, duration=10)
+other, sr = load_audio(f"{audio_path}{song_id}/other.wav", sr=44100, mono=True, duration=10)
+vocals, sr = load_audio(f"{audio_path}{song_id}/vocals.wav", sr=44100, mono=True, duration=10)
 
 # Setup your mix parameters
 
@@ -0,0 +1,195 @@
+"""
+On-the-fly binaural dataset.
+
+``BinauralIterableDataset`` renders augment.py scenes in memory and yields
+``(binaural, labels)`` without writing anything to disk:
+
+    binaural  float32 (2, N)
+    labels    {"classes":   float32 (n_classes,) multi-hot over class_names,
+               "xyz":       float32 (MAX_CLIPS_PER_SAMPLE, 3) source unit vectors, zero padded,
+               "mask":      bool (MAX_CLIPS_PER_SAMPLE,) which xyz rows are sources,
+               "sample_id": int}
+
+Sample ids are dealt out round-robin over ranks, and each rank's ids round-robin
+over its DataLoader workers. Every sample is seeded from (seed, sample_id) like
+create_dataset, so a sample id renders the same whatever the worker count and no
+two workers repeat an id. ``len()`` counts the ids this rank yields (over all of
+its workers; inside a worker, that worker's share), so DataLoader lengths and
+progress bars are per rank under DDP.
+With torch installed it is a ``torch.utils.data.IterableDataset``:
+
+    loader = DataLoader(BinauralIterableDataset(seed=1), batch_size=64, num_workers=8)
+
+Each iterator renders on a background thread into a bounded prefetch queue,
+so rendering overlaps with whatever the consumer does between items.
+"""
+
+import queue
+import itertools
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import augment
+
+try:
+    from torch.utils.data import IterableDataset as _IterableBase
+    from torch.utils.data import get_worker_info
+except ImportError:  # torch is optional: without it this is a plain iterable
+    _IterableBase = object
+
+    def get_worker_info():
+        return None
+
+
+def default_class_names() -> List[str]:
+    """Sorted class names found in the class CSVs of augment.CLASS_CSV_MAP."""
+    names = set()
+    for _, csv_path in augment.CLASS_CSV_MAP.values():
+        try:
+            names.update(augment.load_csv(csv_path)["class"].astype(str))
+        except FileNotFoundError:
+            continue
+    return sorted(names)
+
+
+class BinauralIterableDataset(_IterableBase):
+    def __init__(
+        self,
+        seed: int = augment.SEED,
+        start_id: int = 0,
+        num_samples: Optional[int] = None,
+        batch_size: int = 1,
+        prefetch: int = 16,
+        class_names: Optional[List[str]] = None,
+        rank: int = 0,
+        world_size: int = 1,
+    ):
+        """
+        Args:
+            seed (int): root seed; sample i renders from (seed, i).
+            start_id (int): first sample id.
+            num_samples (int): ids start_id .. start_id + num_samples - 1, None for an endless stream.
+            batch_size (int): samples per render; > 1 uses augment.render_batch.
+            prefetch (int): rendered samples buffered ahead of the consumer.
+            class_names (list): label vocabulary, defaults to default_class_names().
+            rank (int), world_size (int): this process's slot in distributed training.
+        """
+        super().__init__()
+        self.seed = seed
+        self.start_id = start_id
+        self.num_samples = num_samples
+        self.batch_size = max(1, batch_size)
+        self.prefetch = max(1, prefetch)
+        self.class_names = list(class_names) if class_names is not None else default_class_names()
+        self.rank = rank
+        self.world_size = world_size
+        self._class_index = {name: i for i, name in enumerate(self.class_names)}
+
+    def __len__(self) -> int:
+        """
+        Number of samples this rank yields. DataLoader calls it in the main process,
+        where that is the rank's total over all workers; inside a worker it is the
+        worker's own share.
+        """
+        if self.num_samples is None:
+            raise TypeError("Endless BinauralIterableDataset has no length")
+        return len(self._id_range())
+
+    def _first_and_stride(self) -> Tuple[int, int]:
+        # Rank r takes every world_size-th id from start_id + r, and worker w of
+        # num_workers takes every num_workers-th of those from the w-th
+        info = get_worker_info()
+        worker_id, num_workers = (info.id, info.num_workers) if info is not None else (0, 1)
+        return self.start_id + self.rank + worker_id * self.world_size, self.world_size * num_workers
+
+    def _id_range(self) -> range:
+        first, stride = self._first_and_stride()
+        return range(first, self.start_id + self.num_samples, stride)
+
+    def sample_ids(self) -> Iterator[int]:
+        """The ids this process/worker renders, in order."""
+        if self.num_samples is None:
+            return itertools.count(*self._first_and_stride())
+        return iter(self._id_range())
+
+    def labels(self, sample_id: int, class_list: List[str], coords_list: List) -> Dict:
+        classes = np.zeros(len(self.class_names), dtype=np.float32)
+        for name in class_list:
+            index = self._class_index.get(name)
+            if index is not None:
+                classes[index] = 1.0
+        xyz = np.zeros((augment.MAX_CLIPS_PER_SAMPLE, 3), dtype=np.float32)
+        mask = np.zeros(augment.MAX_CLIPS_PER_SAMPLE, dtype=bool)
+        n = min(len(coords_list), augment.MAX_CLIPS_PER_SAMPLE)
+        if n:
+            xyz[:n] = np.asarray(coords_list[:n], dtype=np.float32)
+            mask[:n] = True
+        return {"classes": classes, "xyz": xyz, "mask": mask, "sample_id": sample_id}
+
+    def _render(self, ids: List[int]) -> List[Tuple[int, np.ndarray, List[str], List]]:
+        if self.batch_size > 1:
+            return augment.render_batch(ids, self.seed)
+        rendered = augment.render_sample(ids[0], self.seed)
+        return [] if rendered is None else [(ids[0], *rendered)]
+
+    def _produce(self, ids: Iterator[int], out: queue.Queue, stop: threading.Event) -> None:
+        def put(item) -> bool:
+            # Re-check stop while the queue is full, so an abandoned iterator frees this thread
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            while not stop.is_set():
+                chunk = list(itertools.islice(ids, self.batch_size))
+                if not chunk:
+                    break
+                for sample_id, binaural, class_list, coords_list in self._render(chunk):
+                    item = (
+                        np.asarray(binaural, dtype=np.float32),
+                        self.labels(sample_id, class_list, coords_list),
+                    )
+                    if not put(item):
+                        return
+        except Exception as e:
+            put(e)
+            return
+        put(None)
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, Dict]]:
+        out: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce, args=(self.sample_ids(), out, stop), name="render-prefetch", daemon=True
+        )
+        producer.start()
+        try:
+            while True:
+                item = out.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            producer.join()
+
+
+if __name__ == "__main__":
+    import time
+
+    dataset = BinauralIterableDataset(num_samples=32)
+    n = 0
+    t0 = time.perf_counter()
+    for n, (binaural, labels) in enumerate(dataset, 1):
+        pass
+    elapsed = time.perf_counter() - t0
+    print(f"Rendered {n} samples in memory ({n / elapsed:.1f} samples/s), last shape {binaural.shape}")
+    print(pd.Series(labels["classes"], index=dataset.class_names).to_string())
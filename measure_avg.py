@@ -1,5 +1,5 @@
 import time, statistics
-from augment import generate_single  # adjust import to your file
+from augment import generate_single, clip_cache_stats  # adjust import to your file
 import tempfile, os
 
 
@@ -13,6 +13,12 @@ def measure_avg(n=200):
     avg = statistics.mean(times)
     p90 = statistics.quantiles(times, n=10)[8]
     print(f"Avg task: {avg * 1000:.2f} ms, p90: {p90 * 1000:.2f} ms")
+    cache = clip_cache_stats()
+    print(
+        f"Clip cache: {cache['hit_rate'] * 100:.1f}% hits "
+        f"({cache['hits']}/{cache['hits'] + cache['misses']}), "
+        f"{cache['clips']} clips, {cache['bytes'] / 1e6:.1f} MB"
+    )
     return avg, p90
 
 
@@ -1,24 +1,57 @@
 import numpy as np
 
-def pick_random_from_range(min_angle: int = 0, max_angle: int = 360) -> int:
+# Every helper takes an optional ``rng`` (a np.random.Generator). Without one they
+# fall back to the global np.random state.
+
+
+def sample_rng(root_seed: int, sample_id: int, stream: int = 0) -> np.random.Generator:
+    """
+    Independent generator for one sample, derived from (root_seed, sample_id).
+    The same pair always gives the same stream, whatever process or machine draws it.
+    stream > 0 gives further independent generators of the same sample, for stages
+    whose draws must not shift the ones made from stream 0.
+    """
+    key = [root_seed, sample_id] if stream == 0 else [root_seed, sample_id, stream]
+    return np.random.default_rng(np.random.SeedSequence(key))
+
+
+def randint(low: int, high: int, rng: np.random.Generator = None) -> int:
+    """
+    Random integer in [low, high), like np.random.randint.
+    """
+    if rng is None:
+        return int(np.random.randint(low, high))
+    return int(rng.integers(low, high))
+
+
+def uniform(low: float, high: float, rng: np.random.Generator = None) -> float:
+    """
+    Random float in [low, high).
+    """
+    return float((np.random if rng is None else rng).uniform(low, high))
+
+
+def pick_random_from_range(
+    min_angle: int = 0, max_angle: int = 360, rng: np.random.Generator = None
+) -> int:
     """
     Pick a random angle between min_angle (inclusive) and max_angle (exclusive in practice).
     This mirrors the prior behavior where int(SystemRandom.uniform(a, b)) almost always
     produced values in [a, b) due to float-to-int truncation.
     """
-    return int(np.random.uniform(min_angle, max_angle))
+    return int(uniform(min_angle, max_angle, rng))
 
 
-def pick_random_clip(clip_list):
+def pick_random_clip(clip_list, rng: np.random.Generator = None):
     """
     Pick a random element from clip_list.
     """
     if not clip_list:
         raise ValueError("clip_list must not be empty")
-    return np.random.choice(clip_list)
+    return (np.random if rng is None else rng).choice(clip_list)
 
 
-def pick_multiple_clips(clip_list, count: int):
+def pick_multiple_clips(clip_list, count: int, rng: np.random.Generator = None):
     """
     Pick multiple random clips without replacement.
     If count > len(clip_list), returns all clips in random order.
@@ -26,8 +59,8 @@ def pick_multiple_clips(clip_list, count: int):
     if count <= 0 or not clip_list:
         return []
     size = min(count, len(clip_list))
-    # np.random.choice without replacement yields a NumPy array; convert to list.
-    return list(np.random.choice(clip_list, size=size, replace=False))
+    # choice without replacement yields a NumPy array; convert to list.
+    return list((np.random if rng is None else rng).choice(clip_list, size=size, replace=False))
 
 
 # Examples (kept similar to original; guarded to avoid side effects on import in other modules)
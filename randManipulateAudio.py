@@ -2,29 +2,33 @@ import myRand
 import numpy as np
 import os
 import pandas as pd
-import librosa
+import soundfile as sf
+from binamix.io import load_audio, resample_audio
 
 
-def getRandomClip(directory: str, csv: str):
+def getRandomClip(directory: str, csv: str, rng: np.random.Generator = None):
     """
     Get a random clip from a directory of audio files
 
     Args:
         directory (str): the directory containing the audio files
         csv (str): the csv file containing the audio file names and metadata, csv should have columns 'name' and 'class'
+        rng (np.random.Generator): random generator to draw from, defaults to the global np.random state.
 
     Returns:
         array of just the audio data
     """
     df = pd.read_csv(csv)
-    random_index = np.random.choice(df.index)
+    random_index = myRand.pick_random_clip(list(df.index), rng)
     audio_path = os.path.join(directory, df.loc[random_index, "name"])
     class_name = df.loc[random_index, "class"]
-    audio, sr = librosa.load(audio_path)
+    audio, sr = load_audio(audio_path, sr=22050)
     return audio, sr, class_name
 
 
-def getRandomTimeWindow(audio, time: float, sr: int | float):
+def getRandomTimeWindow(
+    audio, time: float, sr: int | float, rng: np.random.Generator = None
+):
     """
     Pick a random window time frame within an audio file
 
@@ -32,29 +36,97 @@ def getRandomTimeWindow(audio, time: float, sr: int | float):
         audio: the audio data array (from librosa or torchaudio)
         time (float): the time frame size in seconds.
         sr (int): the sample rate of the audio file.
+        rng (np.random.Generator): random generator to draw from, defaults to the global np.random state.
 
     Returns:
-        array of just the audio data
+        array of just the audio data, zero padded to the window length if the audio is shorter
     """
     target_len = int(time * sr)
     audio_total_length = len(audio)
 
-    # If the audio is shorter than the target length, return the whole audio
+    # If the audio is shorter than the target length, return the whole audio, padded
     if audio_total_length <= target_len:
-        return audio
+        return np.pad(audio, (0, target_len - audio_total_length))
 
     # Calculate the maximum starting position
     max_start = int(audio_total_length * 0.8) - target_len
-    # Get a random starting position
-    start_pos = np.random.randint(0, max_start)
+    # Get a random starting position (the start when the first 80% leave no room)
+    start_pos = myRand.randint(0, max_start, rng) if max_start > 0 else 0
 
     # Extract the window
     end_pos = start_pos + target_len
     return audio[start_pos:end_pos]
 
 
+def getRandomTimeWindowFromFile(
+    path: str,
+    time: float,
+    sr: int,
+    frames: int | None = None,
+    file_sr: int | None = None,
+    margin: float = 0.005,
+    rng: np.random.Generator = None,
+):
+    """
+    Pick a random window time frame from an audio file without decoding the whole file
+
+    The window start is drawn from the file's frame count with the same rule as
+    getRandomTimeWindow, then only the window (plus a small margin on each side
+    for the resampler) is read, mixed to mono and resampled.
+
+    Args:
+        path (str): the audio file to read from.
+        time (float): the time frame size in seconds.
+        sr (int): the sample rate of the returned window.
+        frames (int): the file's frame count, if already known (e.g. from a catalog).
+        file_sr (int): the file's sample rate, if already known.
+        margin (float): extra audio in seconds read on each side of the window for resampling.
+        rng (np.random.Generator): random generator to draw from, defaults to the global np.random state.
+
+    Returns:
+        mono float32 array of the window at sr, zero padded to the window length if the file is shorter
+    """
+    if frames is None or file_sr is None:
+        info = sf.info(path)
+        frames, file_sr = info.frames, info.samplerate
+
+    target_len = int(time * sr)
+    file_target_len = int(np.ceil(time * file_sr))
+
+    if frames <= file_target_len:
+        start, stop, pad = 0, frames, 0
+    else:
+        max_start = int(frames * 0.8) - file_target_len
+        start = myRand.randint(0, max_start, rng) if max_start > 0 else 0
+        stop = start + file_target_len
+        pad = int(np.ceil(margin * file_sr)) if file_sr != sr else 0
+
+    read_start = max(0, start - pad)
+    read_stop = min(frames, stop + pad)
+    with sf.SoundFile(path) as f:
+        f.seek(read_start)
+        block = f.read(read_stop - read_start, dtype="float32", always_2d=True)
+    audio = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+
+    if file_sr == sr:
+        window = audio[:target_len]
+    else:
+        audio = resample_audio(audio, file_sr, sr)
+        lead = int(round((start - read_start) * sr / file_sr))
+        window = audio[lead : lead + target_len].astype(np.float32, copy=False)
+    # Same as getRandomTimeWindow: a file shorter than the window comes back padded
+    if len(window) < target_len:
+        window = np.pad(window, (0, target_len - len(window)))
+    return window
+
+
 def randomlyShiftAudioStartTime(
-    audio, minShiftBy: float, maxShiftBy: float, total_time: float, sr: int | float
+    audio,
+    minShiftBy: float,
+    maxShiftBy: float,
+    total_time: float,
+    sr: int | float,
+    rng: np.random.Generator = None,
 ):
     """
     Randomly shift the start time of an audio clip
@@ -65,6 +137,7 @@ def randomlyShiftAudioStartTime(
         maxShiftBy (float): the maximum time frame will be shifted by in seconds.
         total_time (float): the total time of the frame size in seconds.
         sr (int): the sample rate of the audio file.
+        rng (np.random.Generator): random generator to draw from, defaults to the global np.random state.
 
     Returns:
         array of just the audio data
@@ -76,7 +149,7 @@ def randomlyShiftAudioStartTime(
     max_shift_samples = int(maxShiftBy * sr)
 
     # Get a random shift amount within the specified range
-    shift_samples = np.random.randint(min_shift_samples, max_shift_samples + 1)
+    shift_samples = myRand.randint(min_shift_samples, max_shift_samples + 1, rng)
 
     # Create a new array filled with zeros (silence) of the target length
     shifted_audio = np.zeros(
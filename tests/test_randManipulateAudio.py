@@ -0,0 +1,49 @@
+import numpy as np
+import soundfile as sf
+
+from randManipulateAudio import getRandomTimeWindow, getRandomTimeWindowFromFile
+
+SR = 16000
+
+
+def write_clip(path, n_frames, sr=SR):
+    audio = np.linspace(-0.5, 0.5, n_frames, dtype=np.float32)
+    sf.write(str(path), audio, sr, subtype="FLOAT")
+    return audio
+
+
+def test_file_shorter_than_window_is_padded_like_in_memory(tmp_path):
+    path = tmp_path / "short.wav"
+    audio = write_clip(path, 400)
+    target = int(0.1 * SR)
+
+    from_file = getRandomTimeWindowFromFile(str(path), 0.1, SR, rng=np.random.default_rng(0))
+    in_memory = getRandomTimeWindow(audio, 0.1, SR, rng=np.random.default_rng(0))
+
+    assert len(from_file) == len(in_memory) == target
+    np.testing.assert_array_equal(from_file[:400], audio)
+    assert not from_file[400:].any()
+    np.testing.assert_array_equal(from_file, in_memory)
+
+
+def test_file_shorter_than_window_is_padded_when_resampled(tmp_path):
+    path = tmp_path / "short48k.wav"
+    write_clip(path, 1000, sr=48000)
+
+    window = getRandomTimeWindowFromFile(str(path), 0.1, SR, rng=np.random.default_rng(0))
+
+    assert len(window) == int(0.1 * SR)
+    assert window.dtype == np.float32
+
+
+def test_no_room_for_a_random_start_uses_the_start(tmp_path):
+    # Longer than the window, but the first 80% leave no room to draw a start
+    path = tmp_path / "tight.wav"
+    target = int(0.1 * SR)
+    audio = write_clip(path, target + 100)
+
+    from_file = getRandomTimeWindowFromFile(str(path), 0.1, SR, rng=np.random.default_rng(0))
+    in_memory = getRandomTimeWindow(audio, 0.1, SR, rng=np.random.default_rng(0))
+
+    np.testing.assert_array_equal(from_file, audio[:target])
+    np.testing.assert_array_equal(in_memory, audio[:target])
@@ -1,10 +1,10 @@
 from binamix.sadie_utilities import TrackObject, mix_tracks_binaural
 import soundfile as sf
-import librosa
+from binamix.io import load_audio
 import numpy as np
 
-ak_audio, sr = librosa.load("cs2 sounds/weapons/ak47_01.wav", sr=44100)
-gernade_audio, sr = librosa.load("cs2 sounds/grenade/hegrenade/hegrenade_detonate_02.wav", sr=44100)
+ak_audio, sr = load_audio("cs2 sounds/weapons/ak47_01.wav", sr=44100)
+gernade_audio, sr = load_audio("cs2 sounds/grenade/hegrenade/hegrenade_detonate_02.wav", sr=44100)
 
 # Ensure both audio clips are exactly 0.5 seconds (22050 samples at 44.1 kHz)
 target_len = int(0.5 * sr)
@@ -1,8 +1,12 @@
 import os
+import json
+import hashlib
 import argparse
+import multiprocessing as mp
+from functools import partial
 import pandas as pd
-import librosa
 import soundfile as sf
+from binamix.io import load_audio
 from datetime import datetime
 
 """
@@ -15,6 +19,15 @@ Angles:
 
 Outputs are saved under output/dataset/<relative_input_dir>/<stem>_az{azi}_el{ele}.wav
 and a single CSV index is written to output/dataset_index.csv.
+
+--jobs N renders files on N worker processes (longest files first); each worker
+keeps its IR bank and IR spectra cached across files.
+
+Runs are incremental: output/dataset_manifest.json records a hash of the input
+file (mtime + size, or its content with --hash-inputs) and the render parameters
+for every output WAV, and a rerun only renders outputs whose hash changed or
+whose file is missing. The index is merged with the previous one, keeping rows
+(and created_at) of outputs that were not re-rendered. --force renders everything.
 """
 
 DEFAULT_INPUT_DIRS = [
@@ -24,6 +37,13 @@ DEFAULT_INPUT_DIRS = [
 ]
 
 OUTPUT_ROOT = "output"
+MANIFEST_PATH = os.path.join(OUTPUT_ROOT, "dataset_manifest.json")
+INDEX_PATH = os.path.join(OUTPUT_ROOT, "dataset_index.csv")
+
+# Index columns that change the rendered audio, hashed into the manifest with the input signature
+RENDER_KEYS = (
+    "subject_id", "ir_type", "speaker_layout", "sample_rate", "level", "reverb", "azimuth_deg", "elevation_deg"
+)
 
 
 def build_angle_grids():
@@ -51,6 +71,54 @@ def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
 
+def file_duration(path):
+    # Seconds of audio in a file, 0 if the header can't be read
+    try:
+        return sf.info(path).duration
+    except RuntimeError:
+        return 0.0
+
+
+def input_signature(path, hash_content=False):
+    # What identifies an input's content: mtime + size, or a SHA-1 of the bytes
+    if hash_content:
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return {"sha1": digest.hexdigest()}
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def render_hash(row, signature):
+    payload = {"input": signature, **{key: row[key] for key in RENDER_KEYS}}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def warm_worker(subject_id, sample_rate, ir_type):
+    # Pool initializer: load the IR bank and reverb IR once per worker. The IR spectra
+    # cached by render_source_multi then stay warm across every file the worker renders.
+    from binamix.sadie_utilities import load_reverb_ir, load_sadie_ir_bank
+
+    load_sadie_ir_bank(subject_id, sample_rate, ir_type)
+    load_reverb_ir("1", sample_rate)
+
+
 def render_variations_for_file(
     file_path,
     subject_id,
@@ -63,7 +131,10 @@ def render_variations_for_file(
     elevations,
     output_dataset_root,
     dry_run=False,
+    outputs=None,
 ):
+    # outputs: only render these output paths (None renders the whole grid); rows cover the whole grid
+
     # Keep the input's directory structure under the dataset root
     rel_parent = os.path.dirname(os.path.relpath(file_path, start=os.path.abspath(".")))
 
@@ -76,54 +147,64 @@ def render_variations_for_file(
         mono_audio = None
         sr = sample_rate
     else:
-        mono_audio, sr = librosa.load(file_path, sr=sample_rate, mono=True)
+        mono_audio, sr = load_audio(file_path, sr=sample_rate, mono=True)
 
     stem = os.path.splitext(os.path.basename(file_path))[0]
+    directions = [(azi, ele) for ele in elevations for azi in azimuths]
 
-    for ele in elevations:
-        for azi in azimuths:
-            out_name = f"{stem}_az{int(azi)}_el{int(ele)}.wav"
-            out_path = os.path.join(out_dir, out_name)
-
-            if not dry_run:
-                # Import HRIR engine lazily to avoid requiring SADIE dataset during dry runs
-                from binamix.sadie_utilities import TrackObject, mix_tracks_binaural
-                track = TrackObject(
-                    name="positioned_source",
-                    azimuth=azi,
-                    elevation=ele,
-                    level=level,
-                    reverb=reverb,
-                    audio=mono_audio,
-                )
-                output = mix_tracks_binaural(
-                    tracks=[track],
-                    subject_id=subject_id,
-                    sample_rate=sr,
-                    ir_type=ir_type,
-                    speaker_layout=speaker_layout,
-                    mode="auto",
-                )
-                sf.write(out_path, output.T, sr)
-
-            rows.append(
-                {
-                    "input_file": file_path,
-                    "output_file": out_path,
-                    "subject_id": subject_id,
-                    "ir_type": ir_type,
-                    "speaker_layout": speaker_layout,
-                    "sample_rate": sample_rate,
-                    "level": level,
-                    "reverb": reverb,
-                    "azimuth_deg": azi,
-                    "elevation_deg": ele,
-                }
-            )
+    for azi, ele in directions:
+        out_name = f"{stem}_az{int(azi)}_el{int(ele)}.wav"
+        out_path = os.path.join(out_dir, out_name)
+        rows.append(
+            {
+                "input_file": file_path,
+                "output_file": out_path,
+                "subject_id": subject_id,
+                "ir_type": ir_type,
+                "speaker_layout": speaker_layout,
+                "sample_rate": sample_rate,
+                "level": level,
+                "reverb": reverb,
+                "azimuth_deg": azi,
+                "elevation_deg": ele,
+            }
+        )
+
+    if not dry_run:
+        # Import HRIR engine lazily to avoid requiring SADIE dataset during dry runs
+        from binamix.sadie_utilities import add_reverb, iter_render_source_multi, load_reverb_ir
+
+        # Same signal chain as mix_tracks_binaural with one track, but the reverb and the
+        # source FFT are done once per file and shared by every grid direction
+        todo = [i for i, row in enumerate(rows) if outputs is None or row["output_file"] in outputs]
+        source = add_reverb(mono_audio, reverb, load_reverb_ir("1", sr))
+        for i, output in iter_render_source_multi(
+            source, subject_id, sr, ir_type, speaker_layout, [directions[i] for i in todo], mode="auto"
+        ):
+            sf.write(rows[todo[i]]["output_file"], (output * level).T, sr)
 
     return rows
 
 
+def render_job(job, render_file):
+    # Pool task: (input file, output paths to render)
+    file_path, outputs = job
+    return render_file(file_path, outputs=outputs)
+
+
+def merge_index(rows, created_at, index_path=INDEX_PATH):
+    # This run's rows (in input order) after the previous index's rows for outputs this run didn't plan
+    df = pd.DataFrame(rows)
+    df.insert(0, "created_at", [created_at[row["output_file"]] for row in rows])
+    if os.path.exists(index_path):
+        previous = pd.read_csv(index_path)
+        previous = previous[~previous["output_file"].isin(df["output_file"])]
+        previous = previous[previous["output_file"].map(os.path.exists)]
+        df = pd.concat([previous, df], ignore_index=True)
+    df.to_csv(index_path, index=False)
+    return df
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Generate a labeled binaural dataset over azimuth/elevation grids.")
     parser.add_argument(
@@ -143,6 +224,22 @@ def parse_args():
     parser.add_argument("--level", type=float, default=0.8, help="Output track level scaling [0..1]. Default: 0.8")
     parser.add_argument("--reverb", type=float, default=0.0, help="Reverb mix [0..1]. Default: 0.0")
     parser.add_argument("--dry-run", action="store_true", help="Do not render audio, only emit metadata plan.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes rendering files in parallel. Default: 1 (serial)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Render every output, even those the manifest says are up to date.",
+    )
+    parser.add_argument(
+        "--hash-inputs",
+        action="store_true",
+        help="Identify inputs by a hash of their content instead of mtime + size.",
+    )
     parser.add_argument(
         "--max-files",
         type=int,
@@ -163,33 +260,86 @@ def main():
     dataset_root = os.path.join(OUTPUT_ROOT, "dataset")
     ensure_dir(dataset_root)
 
-    all_rows = []
+    render_file = partial(
+        render_variations_for_file,
+        subject_id=args.subject,
+        sample_rate=args.sr,
+        ir_type=args.ir_type,
+        speaker_layout=args.layout,
+        level=args.level,
+        reverb=args.reverb,
+        azimuths=azimuths,
+        elevations=elevations,
+        output_dataset_root=dataset_root,
+        dry_run=args.dry_run,
+    )
+
     print(f"Found {len(input_files)} input WAV file(s). Rendering {len(azimuths)} azimuths x {len(elevations)} elevations each.")
-    for idx, wav_path in enumerate(input_files, 1):
-        print(f"[{idx}/{len(input_files)}] Processing: {wav_path}")
-        rows = render_variations_for_file(
-            file_path=wav_path,
-            subject_id=args.subject,
-            sample_rate=args.sr,
-            ir_type=args.ir_type,
-            speaker_layout=args.layout,
-            level=args.level,
-            reverb=args.reverb,
-            azimuths=azimuths,
-            elevations=elevations,
-            output_dataset_root=dataset_root,
-            dry_run=args.dry_run,
-        )
-        all_rows.extend(rows)
 
-    index_path = os.path.join(OUTPUT_ROOT, "dataset_index.csv")
-    df = pd.DataFrame(all_rows)
-    df.insert(0, "created_at", datetime.utcnow().isoformat())
-    df.to_csv(index_path, index=False)
-    print(f"Wrote metadata index: {index_path}")
+    # Plan the whole grid, and find the outputs whose inputs or parameters changed since the last run
+    manifest = load_manifest()
+    previous_created = {}
+    if os.path.exists(INDEX_PATH):
+        previous = pd.read_csv(INDEX_PATH, usecols=["created_at", "output_file"])
+        previous_created = dict(zip(previous["output_file"], previous["created_at"]))
+
+    rows_by_file = {}
+    hashes = {}
+    stale = {}
+    for wav_path in input_files:
+        rows = render_file(wav_path, dry_run=True)
+        signature = input_signature(wav_path, args.hash_inputs)
+        rows_by_file[wav_path] = rows
+        for row in rows:
+            out_path = row["output_file"]
+            hashes[out_path] = render_hash(row, signature)
+            if args.force or manifest.get(out_path) != hashes[out_path] or not os.path.exists(out_path):
+                stale.setdefault(wav_path, set()).add(out_path)
+
+    n_outputs = len(hashes)
+    n_stale = sum(len(outputs) for outputs in stale.values())
+    print(f"{n_outputs - n_stale}/{n_outputs} output(s) up to date; {n_stale} to render from {len(stale)} file(s).")
+
+    now = datetime.utcnow().isoformat()
+    created_at = {out_path: previous_created.get(out_path, now) for out_path in hashes}
+
+    def record(rows):
+        # Mark a finished file's rendered outputs as up to date
+        for row in rows:
+            out_path = row["output_file"]
+            if out_path in stale[row["input_file"]]:
+                manifest[out_path] = hashes[out_path]
+                created_at[out_path] = now
+
+    if not args.dry_run:
+        jobs = [(wav_path, stale[wav_path]) for wav_path in input_files if wav_path in stale]
+        try:
+            if args.jobs > 1:
+                # Longest files first, so a long file picked up last doesn't leave the other workers idle
+                jobs.sort(key=lambda job: file_duration(job[0]), reverse=True)
+                print(f"Rendering with {args.jobs} worker processes...")
+                with mp.Pool(
+                    processes=args.jobs,
+                    initializer=warm_worker,
+                    initargs=(args.subject, args.sr, args.ir_type),
+                ) as pool:
+                    for idx, rows in enumerate(pool.imap_unordered(partial(render_job, render_file=render_file), jobs), 1):
+                        record(rows)
+                        print(f"[{idx}/{len(jobs)}] Done: {rows[0]['input_file']}")
+            else:
+                for idx, job in enumerate(jobs, 1):
+                    print(f"[{idx}/{len(jobs)}] Processing: {job[0]}")
+                    record(render_job(job, render_file))
+        finally:
+            # Keep what finished even if the run is interrupted, so a rerun picks up from there
+            save_manifest(manifest)
+
+    # Index rows in input order, whatever order the files finished in
+    all_rows = [row for wav_path in input_files for row in rows_by_file[wav_path]]
+    merge_index(all_rows, created_at)
+    print(f"Wrote metadata index: {INDEX_PATH}")
     if args.dry_run:
         print("Dry run complete. No audio rendered.")
 
-
 if __name__ == "__main__":
     main()
@@ -1,16 +1,13 @@
 from audiomentations import AddBackgroundNoise, PolarityInversion
-import librosa
 import soundfile as sf
 import numpy as np
 from binamix.sadie_utilities import TrackObject, mix_tracks_binaural
 from myRand import pick_random_from_range
-import torchaudio
+from binamix.io import load_audio
 
 
-mono_audio , sr = torchaudio.load("cs2 sounds/weapons/ak47_01.wav" , normalize=True)
-resampler = torchaudio.transforms.Resample(sr, 44100)
-# mono_audio =  resampler(mono_audio)
-# mono_audio, sr = librosa.load("cs2 sounds/weapons/ak47_01.wav", mono=True , sr = 44100)
+mono_audio , sr = load_audio("cs2 sounds/weapons/ak47_01.wav", mono=True)
+# mono_audio, sr = load_audio("cs2 sounds/weapons/ak47_01.wav", mono=True , sr = 44100)
 
 track = TrackObject(
     name="positioned_source",
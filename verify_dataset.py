@@ -2,6 +2,8 @@ import pandas as pd
 import soundfile as sf
 import numpy as np
 import os
+from dataset_io import read_metadata
+from utils import cartesian_to_azel
 
 def verify_dataset(dataset_dir="output/dataset"):
     """Verify the generated dataset integrity"""
@@ -11,21 +13,19 @@ def verify_dataset(dataset_dir="output/dataset"):
         print(f"Error: Dataset directory {dataset_dir} does not exist!")
         return False
 
-    # Check if CSV exists
-    csv_path = os.path.join(dataset_dir, "dataset_metadata.csv")
-    if not os.path.exists(csv_path):
-        print(f"Error: Metadata CSV {csv_path} does not exist!")
+    # Load metadata (Parquet or CSV); classes/x/y/z come back as lists
+    df = read_metadata(dataset_dir)
+    if df.empty:
+        print(f"Error: No metadata found in {dataset_dir}!")
         return False
-
-    # Load metadata
-    df = pd.read_csv(csv_path)
     print(f"Dataset contains {len(df)} samples")
     print(f"Columns: {list(df.columns)}")
 
-    # Verify CSV structure
-    expected_columns = ['name_file', 'classes', 'azimuth', 'elevation', 'num_classes']
-    if list(df.columns) != expected_columns:
-        print(f"Warning: Unexpected columns. Expected: {expected_columns}")
+    # Verify metadata structure
+    expected_columns = ['sample_id', 'name_file', 'classes', 'x', 'y', 'z', 'num_classes']
+    missing_columns = [c for c in expected_columns if c not in df.columns]
+    if missing_columns:
+        print(f"Warning: Missing columns {missing_columns}. Expected: {expected_columns}")
 
     # Check first few samples
     print("\nFirst 5 samples:")
@@ -36,6 +36,7 @@ def verify_dataset(dataset_dir="output/dataset"):
     corrupt_files = []
 
     print(f"\nVerifying audio files...")
+    shards = {}
     for i, row in df.iterrows():
         audio_path = os.path.join(dataset_dir, row['name_file'])
 
@@ -43,6 +44,20 @@ def verify_dataset(dataset_dir="output/dataset"):
             missing_files.append(row['name_file'])
             continue
 
+        if audio_path.endswith('.npy'):
+            # Sharded output: check the sample slot exists in its shard
+            try:
+                if audio_path not in shards:
+                    shards[audio_path] = np.load(audio_path, mmap_mode='r')
+                shard = shards[audio_path]
+                if row['shard_offset'] >= shard.shape[0]:
+                    missing_files.append(f"{row['name_file']}[{row['shard_offset']}]")
+                elif shard.ndim != 3 or shard.shape[1] != 2:
+                    print(f"Warning: {row['name_file']} is not a stereo shard")
+            except Exception as e:
+                corrupt_files.append((row['name_file'], str(e)))
+            continue
+
         try:
             # Load audio file
             audio, sr = sf.read(audio_path)
@@ -84,11 +99,7 @@ def verify_dataset(dataset_dir="output/dataset"):
 
     # Class distribution
     print(f"\nClass distribution:")
-    all_classes = []
-    for classes_str in df['classes']:
-        all_classes.extend(classes_str.split(','))
-
-    class_counts = pd.Series(all_classes).value_counts()
+    class_counts = df['classes'].explode().dropna().value_counts()
     print(class_counts.to_string())
 
     # Number of classes per sample
@@ -96,17 +107,17 @@ def verify_dataset(dataset_dir="output/dataset"):
     num_classes_dist = df['num_classes'].value_counts().sort_index()
     print(num_classes_dist.to_string())
 
-    # Azimuth and elevation ranges
+    # Azimuth and elevation ranges, recovered from the stored unit vectors
     print(f"\nSpatial distribution:")
-    all_azimuths = []
-    all_elevations = []
-
-    for az_str, el_str in zip(df['azimuth'], df['elevation']):
-        all_azimuths.extend([int(x) for x in az_str.split(',')])
-        all_elevations.extend([int(x) for x in el_str.split(',')])
-
-    print(f"  Azimuth range: {min(all_azimuths)} to {max(all_azimuths)} degrees")
-    print(f"  Elevation range: {min(all_elevations)} to {max(all_elevations)} degrees")
+    xyz = np.stack(
+        [np.concatenate([np.asarray(v, dtype=float) for v in df[c]]) for c in ('x', 'y', 'z')],
+        axis=-1,
+    )
+    if len(xyz):
+        azel = cartesian_to_azel(xyz, az_from="north")
+        azel[:, 0] = (azel[:, 0] + 180) % 360 - 180  # wrap to [-180, 180)
+        print(f"  Azimuth range: {azel[:, 0].min():.0f} to {azel[:, 0].max():.0f} degrees")
+        print(f"  Elevation range: {azel[:, 1].min():.0f} to {azel[:, 1].max():.0f} degrees")
 
     # Success rate
     success_rate = (len(df) - len(missing_files) - len(corrupt_files)) / len(df) * 100